@@ -1,26 +1,53 @@
 from __future__ import annotations
 
 import argparse
+import csv
 import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yaml
-from sqlalchemy import text
+from sqlalchemy import Text, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from mqk_research import contracts
-from mqk_research.data.adapters.bars_postgres import BarsQuery, history, infer_epoch_unit_strict, EPOCH_MS_THRESHOLD
+from mqk_research.data.adapters.bars_postgres import (
+    EPOCH_MS_THRESHOLD,
+    BarsQuery,
+    cached_epoch_unit,
+    epoch_unit_from_counts,
+    history,
+    md_bars_column_types,
+)
 from mqk_research.features.compute import FeatureConfig, compute_daily_features
-from mqk_research.io.hashing import sha256_bytes, sha256_file
-from mqk_research.io.manifest import file_record, stable_run_id
-from mqk_research.io.pg import PgConfig, make_engine, table_exists
+from mqk_research.io.hashing import HashingWriter, sha256_bytes, sha256_file
+from mqk_research.io.manifest import file_record_with_sha, stable_run_id
+from mqk_research.io.pg import Bind, PgConfig, connect_scope, make_engine, table_exists
 from mqk_research.portfolio.build import build_targets_long_only_equal_weight
 from mqk_research.universe.build import build_universe_swing_v1
 
 
+# libyaml's C loader when PyYAML was built with it (same safe tag set and
+# results as SafeLoader, without per-token interpreter dispatch).
+_YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# One KEY=VALUE line: optional leading whitespace, a key that does not start
+# with '#' (comment lines never match), the first '=', then the value. A value
+# wholly wrapped in one pair of matching quotes is captured without them (group
+# 2 or 3); anything else is taken verbatim, surrounding whitespace aside (group 4).
+_DOTENV_RE = re.compile(
+    r"^[^\S\n]*([^#\s=][^=\n]*?)[^\S\n]*="
+    r"[^\S\n]*(?:\"([^\"\n]*)\"|'([^'\n]*)'|(.*?))[^\S\n]*$",
+    re.MULTILINE,
+)
+
+
 def _load_dotenv_if_present(dotenv_path: Optional[Path] = None) -> None:
     """
     Minimal dotenv loader:
@@ -33,35 +60,31 @@ def _load_dotenv_if_present(dotenv_path: Optional[Path] = None) -> None:
     if not path.exists() or not path.is_file():
         return
 
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" not in line:
-            continue
-        k, v = line.split("=", 1)
-        k = k.strip()
-        v = v.strip().strip('"').strip("'")
-        if not k:
-            continue
-        if os.environ.get(k) is None:
-            os.environ[k] = v
+    # Single regex sweep over the whole file instead of per-line split/strip.
+    for m in _DOTENV_RE.finditer(path.read_text(encoding="utf-8")):
+        key, dq, sq, bare = m.groups()
+        os.environ.setdefault(key, dq if dq is not None else sq if sq is not None else bare)
 
 
-def _try_reuse_existing_run(run_dir: Path, expected: Dict[str, Any]) -> bool:
-    """Return True if an existing run directory matches the expected inputs.
+def _try_reuse_existing_run(run_dir: Path, expected: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """Return (reusable, drift) for an existing run directory.
 
     Patch 2.4: Make runs idempotent and non-destructive.
     If deterministic run_id maps to an existing directory whose manifest matches
     the requested inputs, re-use it and avoid rewriting files.
+    Outputs whose bytes no longer match the manifest digests are not re-used:
+    drift then says which output (or the outputs record itself) no longer
+    matches, so the caller can tell modified outputs from different inputs.
+    drift is None whenever the inputs do not match (or there is no manifest).
     """
     manifest_path = run_dir / "manifest.json"
     if not run_dir.exists() or not run_dir.is_dir() or not manifest_path.exists():
-        return False
+        return False, None
     try:
-        raw = json.loads(manifest_path.read_text(encoding="utf-8"))
+        # json.loads takes the UTF-8 bytes directly; no separate decode pass.
+        raw = json.loads(manifest_path.read_bytes())
     except Exception:
-        return False
+        return False, None
 
     def _get(d: Dict[str, Any], path: str) -> Any:
         cur: Any = d
@@ -88,17 +111,41 @@ def _try_reuse_existing_run(run_dir: Path, expected: Dict[str, Any]) -> bool:
 
     for k, v in expected.items():
         if checks.get(k) != v:
-            return False
-    return True
-
-
-def _require_md_bars_nonempty(engine) -> None:
-    q = text("select count(*) from md_bars")
-    with engine.connect() as cxn:
-        n = int(cxn.execute(q).scalar())
-        db = cxn.execute(text("select current_database()")).scalar()
-        usr = cxn.execute(text("select current_user")).scalar()
-    if n <= 0:
+            return False, None
+
+    # Fail closed on drifted artifacts: every declared output must still hash to
+    # its recorded digest. Resolved by file name inside run_dir, since the
+    # recorded path depends on the cwd of the original run.
+    outputs = raw.get("outputs")
+    if not isinstance(outputs, dict) or not outputs:
+        return False, "manifest outputs record is missing or empty"
+    to_hash = []
+    for key, rec in outputs.items():
+        if not isinstance(rec, dict) or "path" not in rec or "sha256" not in rec:
+            return False, f"manifest outputs record {key!r} is malformed"
+        out_path = run_dir / Path(str(rec["path"])).name
+        if not out_path.is_file():
+            return False, f"{out_path.name} is missing"
+        # A recorded size that no longer matches is drift; no need to hash it.
+        if isinstance(rec.get("bytes"), int) and out_path.stat().st_size != rec["bytes"]:
+            return False, f"{out_path.name} size no longer matches the manifest"
+        to_hash.append((out_path, rec["sha256"]))
+    # Digests are the whole cost of a rerun; hashlib releases the GIL on large
+    # updates, so the files hash concurrently.
+    with ThreadPoolExecutor(max_workers=len(to_hash)) as ex:
+        digests = list(ex.map(lambda item: sha256_file(item[0]), to_hash))
+    for d, (out_path, sha) in zip(digests, to_hash):
+        if d != sha:
+            return False, f"{out_path.name} sha256 no longer matches the manifest"
+    return True, None
+
+
+def _require_md_bars_nonempty(bind: Bind) -> None:
+    # One round-trip; exists() stops at the first row instead of counting md_bars.
+    q = text("select current_database(), current_user, exists(select 1 from md_bars)")
+    with connect_scope(bind) as cxn:
+        db, usr, nonempty = cxn.execute(q).one()
+    if not nonempty:
         raise RuntimeError(
             "Preflight failed: md_bars is empty.\n"
             f"  database={db} user={usr}\n"
@@ -112,104 +159,92 @@ def preflight(engine) -> dict:
     Patch 2.6: enforce epoch unit deterministically for integer md_bars timestamps.
     Returns a dict intended to be JSON-printed.
     """
-    with engine.connect() as cxn:
-        db = cxn.execute(text("select current_database()")).scalar()
-        usr = cxn.execute(text("select current_user")).scalar()
-
-        md_rows = int(cxn.execute(text("select count(*) from md_bars")).scalar())
-
-        tf_rows = cxn.execute(
-            text(
-                """
-                select timeframe, count(*) as n
-                from md_bars
-                group by timeframe
-                order by timeframe asc
-                """
-            )
-        ).fetchall()
-        timeframes = [{"timeframe": r[0], "rows": int(r[1])} for r in tf_rows]
-
-        # We assume md_bars uses integer epoch end_ts in this system.
-        # If your schema changes, update this intentionally (fail closed).
-        cols = cxn.execute(
-            text(
-                """
-                select column_name, data_type
-                from information_schema.columns
-                where table_schema='public' and table_name='md_bars'
-                order by ordinal_position
-                """
-            )
-        ).fetchall()
-        col_types = {name: dtype for (name, dtype) in cols}
-        if "end_ts" not in col_types:
-            raise RuntimeError(
-                "Preflight unsafe: md_bars missing expected end_ts column. "
-                "This system requires a deterministic bar timestamp column (end_ts)."
-            )
+    # We assume md_bars uses integer epoch end_ts in this system.
+    # If your schema changes, update this intentionally (fail closed).
+    col_types = md_bars_column_types(engine)
+    if "end_ts" not in col_types:
+        raise RuntimeError(
+            "Preflight unsafe: md_bars missing expected end_ts column. "
+            "This system requires a deterministic bar timestamp column (end_ts)."
+        )
 
-        end_ts_type = str(col_types["end_ts"]).lower()
-        is_integer_ts = end_ts_type in {"bigint", "integer", "smallint"}
-
-        mm = cxn.execute(text("select min(end_ts), max(end_ts) from md_bars")).fetchone()
-        min_end_ts, max_end_ts = mm[0], mm[1]
-
-        unit = None
-        interpreted = {"min": None, "max": None}
-        counts = {"n_ms": None, "n_s": None, "n_total": None}
-
-        if is_integer_ts:
-            # Strict unit enforcement (fails closed on mixed units).
-            unit = infer_epoch_unit_strict(engine, "end_ts")
-
-            cnt = cxn.execute(
-                text(
-                    """
-                    select
-                      sum(case when end_ts >= :thresh then 1 else 0 end) as n_ms,
-                      sum(case when end_ts <  :thresh then 1 else 0 end) as n_s,
-                      count(*) as n_total
-                    from md_bars
-                    where end_ts is not null
-                    """
-                ),
-                {"thresh": int(EPOCH_MS_THRESHOLD)},
-            ).fetchone()
-            counts = {"n_ms": int(cnt[0] or 0), "n_s": int(cnt[1] or 0), "n_total": int(cnt[2] or 0)}
-
-            # Convert using the detected unit (only one interpretation).
-            if min_end_ts is not None:
-                min_dt = datetime.fromtimestamp(int(min_end_ts) / 1000.0, tz=timezone.utc) if unit == "ms" else datetime.fromtimestamp(int(min_end_ts), tz=timezone.utc)
-                interpreted["min"] = str(min_dt)
-            if max_end_ts is not None:
-                max_dt = datetime.fromtimestamp(int(max_end_ts) / 1000.0, tz=timezone.utc) if unit == "ms" else datetime.fromtimestamp(int(max_end_ts), tz=timezone.utc)
-                interpreted["max"] = str(max_dt)
+    end_ts_type = str(col_types["end_ts"]).lower()
+    is_integer_ts = end_ts_type in {"bigint", "integer", "smallint"}
 
-        else:
-            # If end_ts is not integer, we treat it as timestamptz-ish and report directly.
-            # This code path stays deterministic.
-            unit = "timestamptz"
-            interpreted["min"] = None if min_end_ts is None else str(min_end_ts)
-            interpreted["max"] = None if max_end_ts is None else str(max_end_ts)
-
-        sym_count = int(cxn.execute(text("select count(distinct symbol) from md_bars")).scalar())
-        top_syms = cxn.execute(
-            text(
-                """
-                select symbol
-                from (
-                  select distinct symbol
-                  from md_bars
-                ) s
-                order by symbol asc
-                limit 20
-                """
-            )
-        ).fetchall()
-        top_symbols = [r[0] for r in top_syms]
+    # Everything else in one round-trip. The unit split is aggregated in the same
+    # md_bars scan as min/max (integer end_ts only), and the unit is decided from
+    # it locally, rather than by infer_epoch_unit_strict's two extra scans.
+    unit_split = (
+        """
+          sum(case when end_ts >= :thresh then 1 else 0 end) as n_ms,
+          sum(case when end_ts <  :thresh then 1 else 0 end) as n_s,
+          count(end_ts) as n_total
+        """
+        if is_integer_ts
+        else "null as n_ms, null as n_s, null as n_total"
+    )
+    q = text(
+        f"""
+        select
+          current_database() as db,
+          current_user as usr,
+          to_regclass('public.corporate_events') is not null as corp_exists,
+          b.n_rows, b.min_end_ts, b.max_end_ts, b.n_ms, b.n_s, b.n_total,
+          tf.tf_names, tf.tf_counts,
+          sy.n_symbols, sy.top_symbols,
+          (select array_agg(indexdef order by indexname) from pg_indexes
+            where schemaname = 'public' and tablename = 'md_bars') as md_indexes
+        from (
+          select count(*) as n_rows, min(end_ts) as min_end_ts, max(end_ts) as max_end_ts, {unit_split}
+          from md_bars
+        ) b
+        cross join (
+          select array_agg(timeframe order by timeframe) as tf_names, array_agg(n order by timeframe) as tf_counts
+          from (select timeframe, count(*) as n from md_bars group by timeframe) t
+        ) tf
+        cross join (
+          select count(symbol) as n_symbols, (array_agg(symbol order by symbol))[1:20] as top_symbols
+          from (select distinct symbol from md_bars) s
+        ) sy
+        """
+    )
+    params = {"thresh": int(EPOCH_MS_THRESHOLD)} if is_integer_ts else {}
+    with engine.connect() as cxn:
+        row = cxn.execute(q, params).one()
+    (db, usr, corp_exists,
+     md_rows, min_end_ts, max_end_ts, n_ms, n_s, n_total,
+     tf_names, tf_counts,
+     sym_count, top_syms,
+     md_indexes) = row
+
+    md_rows = int(md_rows)
+    sym_count = int(sym_count)
+    top_symbols = list(top_syms or [])
+    timeframes = [{"timeframe": tf, "rows": int(n)} for tf, n in zip(tf_names or [], tf_counts or [])]
+
+    unit = None
+    interpreted = {"min": None, "max": None}
+    counts = {"n_ms": None, "n_s": None, "n_total": None}
+
+    if is_integer_ts:
+        # Strict unit enforcement (fails closed on mixed units).
+        unit = epoch_unit_from_counts("end_ts", min_end_ts, max_end_ts, n_ms, n_s, n_total)
+        counts = {"n_ms": int(n_ms or 0), "n_s": int(n_s or 0), "n_total": int(n_total or 0)}
+
+        # Convert using the detected unit (only one interpretation).
+        if min_end_ts is not None:
+            min_dt = datetime.fromtimestamp(int(min_end_ts) / 1000.0, tz=timezone.utc) if unit == "ms" else datetime.fromtimestamp(int(min_end_ts), tz=timezone.utc)
+            interpreted["min"] = str(min_dt)
+        if max_end_ts is not None:
+            max_dt = datetime.fromtimestamp(int(max_end_ts) / 1000.0, tz=timezone.utc) if unit == "ms" else datetime.fromtimestamp(int(max_end_ts), tz=timezone.utc)
+            interpreted["max"] = str(max_dt)
 
-        corp_exists = cxn.execute(text("select to_regclass('public.corporate_events')")).scalar() is not None
+    else:
+        # If end_ts is not integer, we treat it as timestamptz-ish and report directly.
+        # This code path stays deterministic.
+        unit = "timestamptz"
+        interpreted["min"] = None if min_end_ts is None else str(min_end_ts)
+        interpreted["max"] = None if max_end_ts is None else str(max_end_ts)
 
     return {
         "database": db,
@@ -219,6 +254,8 @@ def preflight(engine) -> dict:
             "distinct_symbols": sym_count,
             "top_symbols": top_symbols,
             "timeframes": timeframes,
+            # history() range-scans (symbol, timeframe, ts); see bars_postgres.history.
+            "indexes": list(md_indexes or []),
             "end_ts": {
                 "min_raw": min_end_ts,
                 "max_raw": max_end_ts,
@@ -251,9 +288,21 @@ def _load_policy(path: Path) -> Dict[str, Any]:
       - policy_name (preferred)
       - name (legacy)
     """
+    return _read_policy(path)[0]
+
+
+def _read_policy(path: Path) -> Tuple[Dict[str, Any], str]:
+    """
+    _load_policy plus the sha256 of the policy file, from a single read.
+
+    Parsing and hashing the same bytes means the recorded policy_sha256 always
+    describes exactly the policy that was applied.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Policy not found: {path}")
-    obj = yaml.safe_load(path.read_text(encoding="utf-8"))
+    raw = path.read_bytes()
+    policy_sha = sha256_bytes(raw)
+    obj = yaml.load(raw.decode("utf-8"), Loader=_YAML_SAFE_LOADER)
     if not isinstance(obj, dict):
         raise ValueError(f"Invalid policy YAML (not a mapping): {path}")
 
@@ -275,17 +324,108 @@ def _load_policy(path: Path) -> Dict[str, Any]:
     sv = obj.get("schema_version", "1")
     obj["schema_version"] = str(sv)
 
-    return obj
+    return obj, policy_sha
+
+
+# Large write buffer: to_csv emits many small row writes; batching them into
+# 1 MiB syscalls keeps the write phase CPU-bound rather than syscall-bound.
+_CSV_WRITE_BUFFER_BYTES = 1024 * 1024
 
+# Characters that make QUOTE_MINIMAL quote a field.
+_CSV_QUOTE_TRIGGERS = '[,"\r\n]'
 
-def _write_csv_deterministic(df: pd.DataFrame, path: Path) -> None:
+
+def _csv_needs_quoting(df: pd.DataFrame) -> bool:
+    """
+    True if QUOTE_MINIMAL could quote any field of df.
+
+    Numeric, bool and datetime columns never render a delimiter, quote or line
+    break, so only text columns (and the header) need scanning. A single-column
+    frame is always treated as quoting-sensitive: csv quotes a lone empty field.
+    """
+    if df.shape[1] < 2:
+        return True
+    if any(ch in str(c) for c in df.columns for ch in ',"\r\n'):
+        return True
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_datetime64_any_dtype(s):
+            continue
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # Every rendered value is one of the categories.
+            s = pd.Series(s.cat.categories)
+        if s.astype(str).str.contains(_CSV_QUOTE_TRIGGERS, regex=True).any():
+            return True
+    return False
+
+
+def _preformat_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace datetime columns with their CSV text, formatting each distinct value once.
+
+    to_csv formats every datetime cell individually, but bar/feature frames carry
+    only a few hundred distinct timestamps. The distinct values are rendered by
+    the same formatter with the same whole-array format decision (the set of
+    values is identical), so the bytes do not change; NaT renders as "" (na_rep).
+    """
+    rendered: Dict[str, Any] = {}
+    for c in df.columns:
+        if not pd.api.types.is_datetime64_any_dtype(df[c]):
+            continue
+        codes, uniques = pd.factorize(df[c])
+        text_values = np.append(np.asarray(uniques.astype(str), dtype=object), "")
+        rendered[c] = text_values[codes]  # code -1 (NaT) picks the trailing ""
+    return df.assign(**rendered) if rendered else df
+
+
+def _to_csv_deterministic(df: pd.DataFrame, sink: Any) -> None:
+    # Our frames are numeric plus ticker-like text, so the per-field quoting
+    # analysis of QUOTE_MINIMAL is pure overhead. Skip it when a scan proves no
+    # field would be quoted: the bytes are identical either way. Fall back to the
+    # default dialect otherwise (never escape, that would change bytes).
+    quoting = csv.QUOTE_MINIMAL if _csv_needs_quoting(df) else csv.QUOTE_NONE
+    df = _preformat_datetime_columns(df)
+    df.to_csv(sink, index=False, lineterminator="\n", encoding="utf-8", quoting=quoting)
+
+
+def _write_csv_deterministic(df: pd.DataFrame, path: Path) -> Tuple[str, int]:
+    """Write df as deterministic CSV; return (sha256_hex, byte_size) of the bytes written."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False, lineterminator="\n")
+    with path.open("wb", buffering=_CSV_WRITE_BUFFER_BYTES) as f:
+        # Digest the bytes on their way to disk instead of re-reading the file.
+        sink = HashingWriter(f)
+        _to_csv_deterministic(df, sink)
+    return sink.hexdigest(), sink.nbytes
 
 
-def finalize_for_csv(df: pd.DataFrame, kind: str) -> pd.DataFrame:
-    out = df.copy()
+def _rows_in_sort_order(df: pd.DataFrame, keys: List[str]) -> bool:
+    """
+    True if a mergesort sort_values(keys) would leave df's rows where they are.
 
+    Each key becomes its sorted factorize codes (nulls last, categoricals in
+    category order), folded into one int64 composite key, so the check is a
+    single vectorized comparison. A leading key that is not monotonic (or holds
+    nulls) short-circuits to False, which only costs the caller a real sort.
+    """
+    if len(df) < 2:
+        return True
+    if not df[keys[0]].is_monotonic_increasing:
+        return False
+    composite = np.zeros(len(df), dtype=np.int64)
+    span = 1
+    for k in keys:
+        codes, uniques = pd.factorize(df[k], sort=True)
+        width = len(uniques) + 1
+        if span > np.iinfo(np.int64).max // width:
+            # Re-densify so the next multiply cannot overflow.
+            composite, dense = pd.factorize(composite, sort=True)
+            span = len(dense)
+        composite = composite * width + np.where(codes < 0, len(uniques), codes)
+        span *= width
+    return bool((composite[1:] >= composite[:-1]).all())
+
+
+def finalize_for_csv(df: pd.DataFrame, kind: str) -> pd.DataFrame:
     preferred = {
         "features": ["instrument_id", "symbol", "asset_class", "ts_utc"],
         "universe": [
@@ -306,22 +446,32 @@ def finalize_for_csv(df: pd.DataFrame, kind: str) -> pd.DataFrame:
     }
 
     pref = preferred.get(kind, [])
-    cols = list(out.columns)
+    cols = list(df.columns)
     ordered = [c for c in pref if c in cols] + sorted([c for c in cols if c not in pref])
-    out = out.loc[:, ordered]
 
     sort_keys = []
-    if "symbol" in out.columns:
+    if "symbol" in cols:
         sort_keys.append("symbol")
-    if "ts_utc" in out.columns:
+    if "ts_utc" in cols:
         sort_keys.append("ts_utc")
-    if kind == "universe" and "rank" in out.columns:
+    if kind == "universe" and "rank" in cols:
         sort_keys.append("rank")
-    if "instrument_id" in out.columns:
+    if "instrument_id" in cols:
         sort_keys.append("instrument_id")
 
+    # reindex already yields a new frame; no separate defensive copy of the input
+    # (for bars that copy was a full extra image made just to hash it). reindex
+    # shares the input's columns only under copy-on-write (the pandas 3
+    # default); on pandas 2 without it, reindex itself copies them.
+    out = df.reindex(columns=ordered)
     if sort_keys:
-        out = out.sort_values(sort_keys, kind="mergesort", ignore_index=True)
+        # Bars arrive ORDER BY symbol, ts and features are built per symbol, so
+        # the rows are usually in order already and the sort's full-frame take
+        # (one more image of the frame) can be skipped.
+        if _rows_in_sort_order(out, sort_keys):
+            out = out.reset_index(drop=True)
+        else:
+            out = out.sort_values(sort_keys, kind="mergesort", ignore_index=True)
 
     round_2 = {"adv_usd_20"}
     round_8 = {
@@ -335,18 +485,110 @@ def finalize_for_csv(df: pd.DataFrame, kind: str) -> pd.DataFrame:
         "score",
     }
 
-    for c in out.columns:
-        if c in round_2 and pd.api.types.is_numeric_dtype(out[c]):
-            out[c] = out[c].round(2)
-        elif c in round_8 and pd.api.types.is_numeric_dtype(out[c]):
-            out[c] = out[c].round(8)
-
-    return out
+    decimals = {
+        c: (2 if c in round_2 else 8)
+        for c in out.columns
+        if (c in round_2 or c in round_8) and pd.api.types.is_numeric_dtype(out[c])
+    }
+    # One DataFrame.round call instead of a per-column assign loop; same
+    # per-column rounding, so identical values.
+    return out.round(decimals) if decimals else out
 
 
 def _hash_df_csv_bytes(df: pd.DataFrame) -> str:
-    b = df.to_csv(index=False, lineterminator="\n").encode("utf-8")
-    return sha256_bytes(b)
+    # Stream the CSV serialization straight into the digest; the full CSV
+    # image is never materialized (bars can be large on long lookbacks).
+    sink = HashingWriter()
+    _to_csv_deterministic(df, sink)
+    return sink.hexdigest()
+
+
+def _as_utc_datetimes(s: pd.Series) -> pd.Series:
+    """
+    s as tz-aware UTC datetimes. history() already yields datetime64[*, UTC];
+    that column is returned as is rather than round-tripped through to_datetime,
+    which would copy (and re-validate) every timestamp.
+    """
+    if isinstance(s.dtype, pd.DatetimeTZDtype) and str(s.dtype.tz) == "UTC":
+        return s
+    return pd.to_datetime(s, utc=True)
+
+
+def _norm_symbols(symbols: Optional[Iterable[str]]) -> List[str]:
+    """Request symbols as the DB stores them: stripped, upper-cased, de-duplicated, sorted; blanks dropped."""
+    return sorted({u for u in (s.strip().upper() for s in (symbols or ()) if s) if u})
+
+
+def _upper_symbols(s: pd.Series) -> pd.Series:
+    """
+    Upper-case a symbol column. A categorical column is normalized on its
+    categories (one string op per distinct symbol) and stays categorical.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        upper = s.cat.categories.astype(str).str.upper()
+        if upper.is_unique:
+            return s.cat.rename_categories(upper)
+    return s.astype(str).str.upper()
+
+
+def _symbol_bar_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-symbol bar count and first/last ts_utc, indexed by symbol (sorted).
+    NaT timestamps are not counted, matching groupby count/min/max.
+
+    history() returns bars ordered by symbol, so the rows are already contiguous
+    per symbol and each statistic is one segment reduction over int64 epochs.
+    Unordered input is stably regrouped first. df must be non-empty.
+    """
+    s = df["symbol"]
+    categories = None
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Segment on the int codes; -1 (null) sorts first, so any null also
+        # sends the column down the regroup path below.
+        categories = s.cat.categories
+        sym = s.cat.codes.to_numpy()
+        grouped = len(sym) < 2 or bool(sym[0] >= 0 and (sym[1:] >= sym[:-1]).all())
+    else:
+        # Zero-copy object view of the symbols (to_numpy would rescan for NA).
+        sym = np.asarray(s.array, dtype=object)
+        grouped = s.is_monotonic_increasing
+    ts = df["ts_utc"]
+    tz = ts.dt.tz
+    # tz-aware values are stored as UTC epochs: tz_convert(None) is a zero-copy view.
+    wall = np.asarray(ts.array.tz_convert(None)) if tz is not None else ts.to_numpy()
+    dt64, i8 = wall.dtype, wall.view("i8")
+
+    # A null symbol makes the column non-monotonic, so nulls always take this
+    # path, where they are dropped as groupby would.
+    if not grouped:
+        keep = s.notna().to_numpy()
+        sym, i8 = sym[keep], i8[keep]
+        order = np.argsort(sym, kind="stable")
+        sym, i8 = sym[order], i8[order]
+
+    nat = np.iinfo(np.int64).min  # NaT's int64 value: already smallest, so max() skips it
+    hi = np.iinfo(np.int64).max
+    valid = i8 != nat
+    # No segments when every symbol was null (a bare leading True would point
+    # reduceat past the end), giving an empty stats frame as groupby would.
+    starts = np.flatnonzero(np.r_[True, sym[1:] != sym[:-1]]) if len(sym) else np.empty(0, dtype=np.intp)
+    if categories is None:
+        uniques = pd.Index(sym[starts], name="symbol")
+    else:
+        uniques = pd.Index(categories.take(sym[starts]), name="symbol")
+
+    last = np.maximum.reduceat(i8, starts)
+    first = np.minimum.reduceat(np.where(valid, i8, hi), starts)
+    first[first == hi] = nat
+    n_bars = np.add.reduceat(valid.astype(np.int64), starts)
+
+    def _ts(v: np.ndarray) -> pd.Series:
+        s = pd.Series(v.view(dt64), index=uniques)
+        return s.dt.tz_localize("UTC").dt.tz_convert(tz) if tz is not None else s
+
+    out = pd.DataFrame({"n_bars": n_bars, "first_ts": _ts(first), "last_ts": _ts(last)}, index=uniques)
+    # Category order need not be lexical; the result is always sorted by symbol.
+    return out if uniques.is_monotonic_increasing else out.sort_index()
 
 
 def _enforce_data_sufficiency(
@@ -362,26 +604,32 @@ def _enforce_data_sufficiency(
     if bars_df is None or bars_df.empty:
         raise RuntimeError("Data gate failed: history returned zero rows.")
 
-    req = [s.strip().upper() for s in symbols if s and s.strip()]
-    req = sorted(set(req))
+    req = _norm_symbols(symbols)
     if not req:
         raise RuntimeError("Data gate failed: empty symbol list.")
 
     if "symbol" not in bars_df.columns or "ts_utc" not in bars_df.columns:
         raise RuntimeError("Data gate failed: bars_df missing required columns (symbol, ts_utc).")
 
-    df = bars_df.copy()
-    df["symbol"] = df["symbol"].astype(str).str.upper()
-    df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True)
+    # Only the two key columns are read, so only they are normalized, into a
+    # narrow frame; the caller's bars are never copied or mutated.
+    df = pd.DataFrame(
+        {"symbol": _upper_symbols(bars_df["symbol"]), "ts_utc": _as_utc_datetimes(bars_df["ts_utc"])},
+        copy=False,
+    )
 
-    present = sorted(df["symbol"].unique().tolist())
-    missing = sorted([s for s in req if s not in set(present)])
+    # Every check below reads this N_symbols-row frame, not the bars themselves.
+    stats = _symbol_bar_stats(df)
+
+    # req and stats.index are both sorted and unique, so np.isin can merge them.
+    req_arr = np.asarray(req, dtype=object)
+    missing = req_arr[~np.isin(req_arr, stats.index.to_numpy(dtype=object), assume_unique=True)].tolist()
     if missing:
         raise RuntimeError(f"Data gate failed: missing symbols in md_bars for requested window: {missing}")
 
-    counts = bars_df.groupby("symbol")["ts_utc"].count().to_dict()
-    min_ts = pd.to_datetime(bars_df["ts_utc"].min(), utc=True)
-    max_ts = pd.to_datetime(bars_df["ts_utc"].max(), utc=True)
+    counts = stats["n_bars"].to_dict()
+    min_ts = stats["first_ts"].min()
+    max_ts = stats["last_ts"].max()
     expected_bdays = len(pd.bdate_range(start=min_ts.date(), end=max_ts.date()))
     dynamic_buffer = max(int(holiday_buffer_days), int(round(expected_bdays * 0.15)))
     required = max(min_bars_floor, expected_bdays - dynamic_buffer)
@@ -396,7 +644,7 @@ def _enforce_data_sufficiency(
         )
 
     asof_end = pd.Timestamp(asof_day_end_utc).tz_convert("UTC")
-    last_ts = df.groupby("symbol", sort=True)["ts_utc"].max().to_dict()
+    last_ts = stats["last_ts"].to_dict()
     stale = sorted(
         [
             s
@@ -413,7 +661,14 @@ def _enforce_data_sufficiency(
         )
 
 
-def _earnings_flags_optional(engine, symbols, asof_utc, days_ahead: int = 14) -> Optional[pd.DataFrame]:
+def _earnings_flags_optional(
+    bind: Bind,
+    symbols,
+    asof_utc,
+    days_ahead: int = 14,
+    *,
+    corporate_events_present: Optional[bool] = None,
+) -> Optional[pd.DataFrame]:
     """
     Returns a DataFrame with columns [symbol, earnings_within_14d] when authoritative
     corporate_events data is available and queryable, or None when it is not.
@@ -424,8 +679,11 @@ def _earnings_flags_optional(engine, symbols, asof_utc, days_ahead: int = 14) ->
 
     A non-None return from a successful empty query (table present, correct schema,
     query succeeded, zero rows) means earnings were genuinely checked and none were found.
+
+    corporate_events_present lets the caller pass an existence check it already made
+    for this run; None means "not known", and the table is probed here.
     """
-    syms = sorted({s.strip().upper() for s in (symbols or []) if s and s.strip()})
+    syms = _norm_symbols(symbols)
     if not syms:
         return None
 
@@ -436,11 +694,16 @@ def _earnings_flags_optional(engine, symbols, asof_utc, days_ahead: int = 14) ->
     start_ts = asof_ts
     end_ts = asof_ts + pd.Timedelta(days=int(days_ahead) + 1)
 
-    with engine.connect() as cxn:
-        reg = cxn.execute(text("select to_regclass('public.corporate_events')")).scalar()
-        if reg is None:
-            # Table absent — earnings data unavailable.
-            return None
+    if corporate_events_present is False:
+        # Table absent (checked by caller) — earnings data unavailable.
+        return None
+
+    with connect_scope(bind) as cxn:
+        if corporate_events_present is None:
+            reg = cxn.execute(text("select to_regclass('public.corporate_events')")).scalar()
+            if reg is None:
+                # Table absent — earnings data unavailable.
+                return None
 
         cols = cxn.execute(
             text(
@@ -482,44 +745,57 @@ def _earnings_flags_optional(engine, symbols, asof_utc, days_ahead: int = 14) ->
         return None
 
     if "date" in ts_dtype and "timestamp" not in ts_dtype:
-        ts_expr = f"({ts_col}::timestamp at time zone 'UTC')"
+        ts_expr = f"(ce.{ts_col}::timestamp at time zone 'UTC')"
     else:
-        ts_expr = ts_col
-
+        ts_expr = f"ce.{ts_col}"
+
+    # The server answers the only question asked downstream: one row per request
+    # symbol with an exists() flag, so the reply is len(syms) small rows however
+    # many events match, and nothing is reduced client-side.
+    # Request symbols are already upper-cased and matched against the bare column,
+    # so each probe can use idx_corporate_events_symbol_date (symbol, event_date).
+    # Wrapping the column in upper() would defeat that index; if mixed-case rows
+    # ever need matching, add a functional index first, e.g.
+    #   create index on corporate_events (upper(symbol), event_type);
     sql = f"""
-        select {symbol_col} as symbol, {ts_expr} as ts_utc, {event_type_col} as event_type
-        from corporate_events
-        where {symbol_col} = any(:symbols)
-          and {event_type_col} = 'EARNINGS'
-          and {ts_expr} >= :start_utc
-          and {ts_expr} < :end_utc
-        order by symbol asc, ts_utc asc
+        select s.symbol, exists(
+            select 1
+            from corporate_events ce
+            where ce.{symbol_col} = s.symbol
+              and ce.{event_type_col} = 'EARNINGS'
+              and {ts_expr} >= :start_utc
+              and {ts_expr} < :end_utc
+        ) as earnings_within_14d
+        from unnest(:symbols) as s(symbol)
     """
 
-    with engine.connect() as cxn:
+    # symbols is bound as a typed text[] (rendered with an explicit ::TEXT[] cast),
+    # so unnest() resolves to text elements whatever the driver infers for a
+    # Python list, and each probe is a plain text = text match on the symbol
+    # column. The savepoint keeps a failed query from aborting the caller's
+    # transaction when `bind` is a shared connection.
+    stmt = text(sql).bindparams(bindparam("symbols", type_=ARRAY(Text)))
+    with connect_scope(bind) as cxn:
         try:
-            df = pd.read_sql(
-                text(sql),
-                cxn,
-                params={
-                    "symbols": syms,
-                    "start_utc": start_ts.to_pydatetime(),
-                    "end_utc": end_ts.to_pydatetime(),
-                },
-            )
+            with cxn.begin_nested():
+                rows = cxn.execute(
+                    stmt,
+                    {
+                        "symbols": syms,
+                        "start_utc": start_ts.to_pydatetime(),
+                        "end_utc": end_ts.to_pydatetime(),
+                    },
+                ).all()
         except Exception:
             # Query failed — earnings data unavailable.
             return None
 
-    # Query succeeded (df may be empty = genuinely no events found; that is real data).
-    df["symbol"] = df["symbol"].astype(str).str.upper()
-    flagged = set(df["symbol"].unique().tolist())
-
-    out = pd.DataFrame(
-        {"symbol": syms, "earnings_within_14d": [s in flagged for s in syms]},
+    # Query succeeded (all flags may be False = genuinely no events found; that is real data).
+    flagged = {str(sym): bool(hit) for sym, hit in rows}
+    return pd.DataFrame(
+        {"symbol": syms, "earnings_within_14d": [flagged.get(sym, False) for sym in syms]},
         columns=["symbol", "earnings_within_14d"],
     )
-    return out
 
 
 def _max_available_ts_for_symbols(engine, symbols: List[str], timeframe: str) -> Optional[datetime]:
@@ -543,7 +819,7 @@ def _max_available_ts_for_symbols(engine, symbols: List[str], timeframe: str) ->
 
     max_raw = int(row[0])
     # Strict unit detection consistent with history/preflight.
-    unit = infer_epoch_unit_strict(engine, "end_ts")  # fails closed if mixed
+    unit = cached_epoch_unit(engine, "end_ts")  # fails closed if mixed
     dt = datetime.fromtimestamp(max_raw / 1000.0, tz=timezone.utc) if unit == "ms" else datetime.fromtimestamp(max_raw, tz=timezone.utc)
     return dt
 
@@ -555,13 +831,25 @@ def _write_manifest_contract(manifest_path: Path, man: contracts.ResearchManifes
     manifest_path.write_text(man.to_json(indent=2) + "\n", encoding="utf-8")
 
 
-def run_phase1_equity(policy_path: Path, asof_utc: pd.Timestamp, pg_url: str, out_root: Path, symbols_csv: str) -> Path:
-    policy = _load_policy(policy_path)
+def run_phase1_equity(
+    policy_path: Path,
+    asof_utc: pd.Timestamp,
+    pg_url: str,
+    out_root: Path,
+    symbols_csv: str,
+    *,
+    bars_partitions: int = 1,
+    bars_via_copy: bool = False,
+    policy: Optional[Dict[str, Any]] = None,
+    policy_sha256: Optional[str] = None,
+) -> Path:
+    # Callers that already parsed policy_path (main does, to route on asset_class)
+    # pass the policy and its digest through instead of re-reading the file.
+    if policy is None:
+        policy, policy_sha = _read_policy(policy_path)
+    else:
+        policy_sha = policy_sha256 or sha256_file(policy_path)
     policy_name = str(policy["policy_name"])
-    policy_sha = sha256_file(policy_path)
-
-    engine = make_engine(PgConfig(url=pg_url))
-    _require_md_bars_nonempty(engine)
 
     if "bars" not in policy or not isinstance(policy["bars"], dict):
         raise RuntimeError("Equity Phase 1 requires policy.bars{timeframe,lookback_days}.")
@@ -573,32 +861,12 @@ def run_phase1_equity(policy_path: Path, asof_utc: pd.Timestamp, pg_url: str, ou
     end_utc = asof_day_end
     start_utc = (end_utc - pd.Timedelta(days=lookback_days)).tz_convert("UTC")
 
-    symbols = [s.strip().upper() for s in symbols_csv.split(",") if s.strip()]
-    symbols = sorted(set(symbols))
+    symbols = _norm_symbols(symbols_csv.split(","))
     if not symbols:
         raise ValueError("--symbols must be non-empty (comma-separated)")
 
-    bars_df = history(engine, BarsQuery(symbols=symbols, start_utc=start_utc, end_utc=end_utc, timeframe=timeframe))
-    _enforce_data_sufficiency(
-        bars_df=bars_df,
-        symbols=symbols,
-        asof_day_end_utc=end_utc,
-        lookback_days=lookback_days,
-        min_bars_floor=60,
-        max_staleness_days=7,
-    )
-
-    feat_cfg = FeatureConfig(atr_window=20, adv_window=20, ret_windows=(1, 5, 20, 60), ma_fast=20, ma_slow=50)
-    feats_df = compute_daily_features(bars_df, feat_cfg)
-
-    earnings_df = _earnings_flags_optional(engine, symbols, asof_day_start, days_ahead=14)
-
-    uni_res = build_universe_swing_v1(features=feats_df, policy=policy, earnings_flags=earnings_df)
-    universe_df = uni_res.df
-    stubbed_earnings = bool(getattr(uni_res, "stubbed_earnings", False))
-
-    targets_df = build_targets_long_only_equal_weight(universe_df, policy)
-
+    # run_id is a pure function of the inputs, so an idempotent rerun is decided
+    # here, before any DB work, bars pull, feature compute or CSV write.
     params = {"symbols": symbols, "timeframe": timeframe, "lookback_days": lookback_days}
     run_id = stable_run_id(policy_name, asof_utc.isoformat(), params)
     run_dir = out_root / run_id
@@ -617,11 +885,67 @@ def run_phase1_equity(policy_path: Path, asof_utc: pd.Timestamp, pg_url: str, ou
         "asset_class": "EQUITY",
         "pipeline": "PHASE1_EQUITY",
     }
-    if _try_reuse_existing_run(run_dir, expected_manifest):
+    reusable, drift = _try_reuse_existing_run(run_dir, expected_manifest)
+    if reusable:
         return run_dir
+    if drift is not None:
+        raise RuntimeError(f"Run directory matches requested inputs but its outputs were modified ({drift}): {run_dir}")
     if (run_dir / "manifest.json").exists():
         raise RuntimeError(f"Run directory already exists but does not match requested inputs: {run_dir}")
 
+    engine = make_engine(PgConfig(url=pg_url))
+
+    # One connection serves the preflight, the bars read, the corporate_events
+    # probe and the earnings lookup instead of a pool checkout per helper
+    # (partitioned bars reads still fan out over the engine's pool).
+    with engine.connect() as cxn:
+        _require_md_bars_nonempty(cxn)
+
+        bars_df = history(
+            cxn,
+            BarsQuery(symbols=symbols, start_utc=start_utc, end_utc=end_utc, timeframe=timeframe),
+            partitions=bars_partitions,
+            via_copy=bars_via_copy,
+        )
+        # md_bars is filtered by exact match on the (upper-cased, sorted) request
+        # symbols, so every row maps onto an ordered category: the gate, the bars
+        # sort and the bars hash then work on int codes, in the same order.
+        if "symbol" in bars_df.columns:
+            bars_df["symbol"] = pd.Categorical(bars_df["symbol"], categories=symbols, ordered=True)
+        _enforce_data_sufficiency(
+            bars_df=bars_df,
+            symbols=symbols,
+            asof_day_end_utc=end_utc,
+            lookback_days=lookback_days,
+            min_bars_floor=60,
+            max_staleness_days=7,
+        )
+
+        # Feature compute is CPU work over bars_df and the earnings lookup is DB
+        # latency; they are independent, so the round-trips hide behind the compute.
+        # Only this thread touches cxn.
+        feat_cfg = FeatureConfig(atr_window=20, adv_window=20, ret_windows=(1, 5, 20, 60), ma_fast=20, ma_slow=50)
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            feats_future = ex.submit(compute_daily_features, bars_df, feat_cfg)
+
+            # Probed once per run: feeds both the earnings lookup and the manifest.
+            corporate_events_present = table_exists(cxn, "corporate_events")
+            earnings_df = _earnings_flags_optional(
+                cxn,
+                symbols,
+                asof_day_start,
+                days_ahead=14,
+                corporate_events_present=corporate_events_present,
+            )
+
+            feats_df = feats_future.result()
+
+    uni_res = build_universe_swing_v1(features=feats_df, policy=policy, earnings_flags=earnings_df)
+    universe_df = uni_res.df
+    stubbed_earnings = bool(getattr(uni_res, "stubbed_earnings", False))
+
+    targets_df = build_targets_long_only_equal_weight(universe_df, policy)
+
     run_dir.mkdir(parents=True, exist_ok=True)
 
     features_path = run_dir / "features.csv"
@@ -633,14 +957,18 @@ def run_phase1_equity(policy_path: Path, asof_utc: pd.Timestamp, pg_url: str, ou
     uni_out = finalize_for_csv(universe_df, "universe")
     tgt_out = finalize_for_csv(targets_df, "targets")
 
-    _write_csv_deterministic(feats_out, features_path)
-    _write_csv_deterministic(uni_out, universe_path)
-    _write_csv_deterministic(tgt_out, targets_path)
+    # Independent files, so the writes can overlap; each file's bytes are
+    # unaffected by scheduling. map() re-raises the first writer failure.
+    writes = [(feats_out, features_path), (uni_out, universe_path), (tgt_out, targets_path)]
+    with ThreadPoolExecutor(max_workers=len(writes)) as ex:
+        (feats_sha, feats_sz), (uni_sha, uni_sz), (tgt_sha, tgt_sz) = ex.map(
+            lambda w: _write_csv_deterministic(*w), writes
+        )
 
     outputs = {
-        "features_csv": file_record(features_path),
-        "universe_csv": file_record(universe_path),
-        "targets_csv": file_record(targets_path),
+        "features_csv": file_record_with_sha(features_path, feats_sha, feats_sz),
+        "universe_csv": file_record_with_sha(universe_path, uni_sha, uni_sz),
+        "targets_csv": file_record_with_sha(targets_path, tgt_sha, tgt_sz),
     }
 
     inputs = {
@@ -655,7 +983,7 @@ def run_phase1_equity(policy_path: Path, asof_utc: pd.Timestamp, pg_url: str, ou
             "bars_sha256_csv": _hash_df_csv_bytes(finalize_for_csv(bars_df, "bars")),
         },
         "optional": {
-            "corporate_events_present": table_exists(engine, "corporate_events"),
+            "corporate_events_present": corporate_events_present,
             "stubbed_earnings": stubbed_earnings,
         },
     }
@@ -697,6 +1025,17 @@ def main(argv: Optional[list[str]] = None) -> None:
     common.add_argument("--pg-url", required=False, default=None, help="Postgres URL. If omitted, MQK_PG_URL env var is used.")
     common.add_argument("--out", default="runs", help="Output root directory (default: runs/)")
     common.add_argument("--symbols", required=True, help="Comma-separated symbols")
+    common.add_argument(
+        "--bars-partitions",
+        type=int,
+        default=1,
+        help="Split the md_bars read by symbol across N concurrent connections sharing one snapshot (default: 1 = single query)",
+    )
+    common.add_argument(
+        "--bars-copy",
+        action="store_true",
+        help="Bulk-read md_bars with COPY ... CSV instead of row-by-row fetch (psycopg driver only; same result)",
+    )
 
     sub.add_parser("features", parents=[common], help="Phase 1: compute features (also emits universe/targets for determinism)")
     sub.add_parser("universe", parents=[common], help="Phase 1: build universe (also computes features/targets)")
@@ -720,7 +1059,7 @@ def main(argv: Optional[list[str]] = None) -> None:
     asof_utc = _parse_utc_ts(args.asof_utc, "asof_utc")
     out_root = Path(args.out)
 
-    policy = _load_policy(policy_path)
+    policy, policy_sha = _read_policy(policy_path)
     asset_class = str(policy.get("asset_class", "EQUITY")).upper()
 
     if asset_class in ("OPTIONS", "FUTURES"):
@@ -743,6 +1082,10 @@ def main(argv: Optional[list[str]] = None) -> None:
         pg_url=pg_url,
         out_root=out_root,
         symbols_csv=args.symbols,
+        bars_partitions=args.bars_partitions,
+        bars_via_copy=args.bars_copy,
+        policy=policy,
+        policy_sha256=policy_sha,
     )
     print(str(run_dir))
 
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import io
+import re
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Literal
+from typing import Dict, Iterator, List, Optional, Tuple, Literal
 
 import pandas as pd
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+
+from mqk_research.io.pg import Bind, connect_scope
 
 
 @dataclass(frozen=True)
@@ -31,36 +38,43 @@ def _require_tz(ts: pd.Timestamp, name: str) -> None:
         raise ValueError(f"{name} must be timezone-aware (UTC recommended)")
 
 
-def _load_md_bars_columns(engine: Engine) -> List[str]:
+# md_bars schema and epoch unit do not change while an engine is in use, so
+# they are looked up once per engine (a Connection shares its engine's entry)
+# instead of once per helper call. Weak keys:
+# entries go away with the engine. An empty column list (md_bars missing) and a
+# mixed-unit failure are never cached.
+_MD_BARS_COLUMNS_CACHE: "weakref.WeakKeyDictionary[Engine, Dict[str, str]]" = weakref.WeakKeyDictionary()
+_EPOCH_UNIT_CACHE: "weakref.WeakKeyDictionary[Engine, Dict[str, EpochUnit]]" = weakref.WeakKeyDictionary()
+
+
+def md_bars_column_types(bind: Bind) -> Dict[str, str]:
+    """md_bars column name -> lowercased data_type, in ordinal order (cached per engine)."""
+    cached = _MD_BARS_COLUMNS_CACHE.get(bind.engine)
+    if cached is not None:
+        return cached
     q = text(
         """
-        select column_name
+        select column_name, data_type
         from information_schema.columns
         where table_schema='public'
           and table_name='md_bars'
         order by ordinal_position asc
         """
     )
-    with engine.connect() as cxn:
+    with connect_scope(bind) as cxn:
         rows = cxn.execute(q).fetchall()
-    return [r[0] for r in rows]
+    types = {str(r[0]): str(r[1]).lower() for r in rows}
+    if types:
+        _MD_BARS_COLUMNS_CACHE[bind.engine] = types
+    return types
 
 
-def _column_db_type(engine: Engine, col: str) -> str:
-    q = text(
-        """
-        select data_type
-        from information_schema.columns
-        where table_schema='public'
-          and table_name='md_bars'
-          and column_name=:col
-        """
-    )
-    with engine.connect() as cxn:
-        row = cxn.execute(q, {"col": col}).fetchone()
-    if row is None:
-        return ""
-    return str(row[0]).lower()
+def _load_md_bars_columns(bind: Bind) -> List[str]:
+    return list(md_bars_column_types(bind))
+
+
+def _column_db_type(bind: Bind, col: str) -> str:
+    return md_bars_column_types(bind).get(col, "")
 
 
 def _pick_first_present(colset: set[str], candidates: List[str]) -> Optional[str]:
@@ -70,12 +84,12 @@ def _pick_first_present(colset: set[str], candidates: List[str]) -> Optional[str
     return None
 
 
-def _detect_md_bars_schema(engine: Engine) -> Tuple[str, str, str, str, str, str, bool]:
+def _detect_md_bars_schema(bind: Bind) -> Tuple[str, str, str, str, str, str, bool]:
     """
     Returns:
       (ts_col, open_col, high_col, low_col, close_col, volume_col, has_is_complete)
     """
-    cols = _load_md_bars_columns(engine)
+    cols = _load_md_bars_columns(bind)
     colset = set(cols)
 
     ts_candidates = [
@@ -137,7 +151,20 @@ def _to_price_float(series: pd.Series, source_col: str) -> pd.Series:
     return series.astype(float)
 
 
-def infer_epoch_unit_strict(engine: Engine, ts_col: str) -> EpochUnit:
+def _upper_symbol_category(series: pd.Series) -> pd.Series:
+    """
+    Upper-cased symbols as a categorical with sorted categories. The string
+    work runs once per distinct symbol rather than once per bar; case variants
+    of one symbol share a category, as per-row upper-casing would merge them.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    upper = pd.Index(uniques).astype(str).str.upper()
+    categories = upper.unique().sort_values()
+    new_codes = categories.get_indexer(upper)[codes]
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=categories), index=series.index)
+
+
+def infer_epoch_unit_strict(bind: Bind, ts_col: str) -> EpochUnit:
     """
     Deterministic, fail-closed inference for integer epoch timestamps.
     - If values span both sides of EPOCH_MS_THRESHOLD => mixed units => error.
@@ -145,10 +172,12 @@ def infer_epoch_unit_strict(engine: Engine, ts_col: str) -> EpochUnit:
         v >= threshold => ms
         v <  threshold => s
     """
-    mm_q = text(f"select min({ts_col}) as min_v, max({ts_col}) as max_v from md_bars where {ts_col} is not null")
-    cnt_q = text(
+    # min/max and the per-side counts come from one md_bars scan.
+    q = text(
         f"""
         select
+          min({ts_col}) as min_v,
+          max({ts_col}) as max_v,
           sum(case when {ts_col} >= :thresh then 1 else 0 end) as n_ms,
           sum(case when {ts_col} <  :thresh then 1 else 0 end) as n_s,
           count(*) as n_total
@@ -156,20 +185,29 @@ def infer_epoch_unit_strict(engine: Engine, ts_col: str) -> EpochUnit:
         where {ts_col} is not null
         """
     )
-    with engine.connect() as cxn:
-        mm = cxn.execute(mm_q).fetchone()
-        cnt = cxn.execute(cnt_q, {"thresh": int(EPOCH_MS_THRESHOLD)}).fetchone()
+    with connect_scope(bind) as cxn:
+        row = cxn.execute(q, {"thresh": int(EPOCH_MS_THRESHOLD)}).fetchone()
+
+    if row is None:
+        return "s"
+    return epoch_unit_from_counts(ts_col, row[0], row[1], row[2], row[3], row[4])
+
 
-    if mm is None or mm[0] is None or mm[1] is None:
+def epoch_unit_from_counts(ts_col: str, min_raw, max_raw, n_ms, n_s, n_total) -> EpochUnit:
+    """
+    The decision half of infer_epoch_unit_strict, for callers that already
+    aggregated min/max and the per-side counts of ts_col (e.g. preflight).
+    """
+    if min_raw is None or max_raw is None:
         # No data: downstream history will fail anyway, but keep deterministic default.
         return "s"
 
-    min_v = int(mm[0])
-    max_v = int(mm[1])
+    min_v = int(min_raw)
+    max_v = int(max_raw)
 
-    n_ms = int(cnt[0] or 0)
-    n_s = int(cnt[1] or 0)
-    n_total = int(cnt[2] or 0)
+    n_ms = int(n_ms or 0)
+    n_s = int(n_s or 0)
+    n_total = int(n_total or 0)
 
     # Mixed => unsafe
     if n_ms > 0 and n_s > 0:
@@ -185,6 +223,22 @@ def infer_epoch_unit_strict(engine: Engine, ts_col: str) -> EpochUnit:
     return "ms" if n_ms > 0 else "s"
 
 
+def cached_epoch_unit(bind: Bind, ts_col: str) -> EpochUnit:
+    """
+    infer_epoch_unit_strict, memoized per (engine, ts_col).
+
+    The inference scans md_bars; within one engine's lifetime the answer is
+    fixed. A mixed-unit failure raises and is not cached, so it fails closed on
+    every call.
+    """
+    per_engine = _EPOCH_UNIT_CACHE.setdefault(bind.engine, {})
+    unit = per_engine.get(ts_col)
+    if unit is None:
+        unit = infer_epoch_unit_strict(bind, ts_col)
+        per_engine[ts_col] = unit
+    return unit
+
+
 def _to_epoch_bound(ts_utc: pd.Timestamp, unit: EpochUnit) -> int:
     # pandas Timestamp -> epoch integer
     sec = int(ts_utc.timestamp())
@@ -198,56 +252,62 @@ def _epoch_series_to_utc(series: pd.Series, unit: EpochUnit) -> pd.Series:
     return pd.to_datetime(series.astype("int64"), unit=unit, utc=True)
 
 
-def _diagnose_empty(engine: Engine, symbols: List[str], timeframe: str, ts_col: str, has_is_complete: bool) -> str:
+def _diagnose_empty(bind: Bind, symbols: List[str], timeframe: str, ts_col: str, has_is_complete: bool) -> str:
     # Deterministic diagnostics. No sampling randomness, all ORDER BY fixed.
-    tf_q = text(
-        """
-        select timeframe, count(*) as n
-        from md_bars
-        where symbol = any(:symbols)
-        group by timeframe
-        order by timeframe asc
-        """
-    )
-    with engine.connect() as cxn:
-        tf_rows = cxn.execute(tf_q, {"symbols": symbols}).fetchall()
-
-    tf_summary = ", ".join([f"{r[0]}={r[1]}" for r in tf_rows]) if tf_rows else "<none>"
-
-    mm_q = text(
+    # One round trip: the per-timeframe and is_complete breakdowns come back as
+    # parallel ordered arrays next to the min/max/count aggregate row.
+    # is_complete may not exist, so its breakdown is only spliced in when it does.
+    comp_cte, comp_cols = "", "null::boolean[] as comp_flags, null::bigint[] as comp_counts"
+    if has_is_complete:
+        comp_cte = """,
+        comp as (
+          select is_complete, count(*) as n
+          from md_bars
+          where symbol = any(:symbols)
+            and timeframe = :timeframe
+          group by is_complete
+        )"""
+        comp_cols = (
+            "(select array_agg(is_complete order by is_complete asc) from comp) as comp_flags, "
+            "(select array_agg(n order by is_complete asc) from comp) as comp_counts"
+        )
+    q = text(
         f"""
-        select min({ts_col}) as min_ts, max({ts_col}) as max_ts, count(*) as n
-        from md_bars
-        where symbol = any(:symbols)
-          and timeframe = :timeframe
+        with tf as (
+          select timeframe, count(*) as n
+          from md_bars
+          where symbol = any(:symbols)
+          group by timeframe
+        ){comp_cte}
+        select
+          (select array_agg(timeframe order by timeframe asc) from tf) as tf_names,
+          (select array_agg(n order by timeframe asc) from tf) as tf_counts,
+          mm.min_ts, mm.max_ts, mm.n,
+          {comp_cols}
+        from (
+          select min({ts_col}) as min_ts, max({ts_col}) as max_ts, count(*) as n
+          from md_bars
+          where symbol = any(:symbols)
+            and timeframe = :timeframe
+        ) mm
         """
     )
-    with engine.connect() as cxn:
-        mm = cxn.execute(mm_q, {"symbols": symbols, "timeframe": timeframe}).fetchone()
+    with connect_scope(bind) as cxn:
+        row = cxn.execute(q, {"symbols": symbols, "timeframe": timeframe}).one()
+    tf_names, tf_counts, min_ts, max_ts, n, comp_flags, comp_counts = row
 
-    mm_str = f"min={mm[0]} max={mm[1]} n={mm[2]}" if mm else "<none>"
+    tf_summary = ", ".join([f"{k}={v}" for k, v in zip(tf_names, tf_counts)]) if tf_names else "<none>"
+    mm_str = f"min={min_ts} max={max_ts} n={n}"
 
     complete_str = "n/a"
     if has_is_complete:
-        c_q = text(
-            """
-            select is_complete, count(*) as n
-            from md_bars
-            where symbol = any(:symbols)
-              and timeframe = :timeframe
-            group by is_complete
-            order by is_complete asc
-            """
-        )
-        with engine.connect() as cxn:
-            c_rows = cxn.execute(c_q, {"symbols": symbols, "timeframe": timeframe}).fetchall()
-        complete_str = ", ".join([f"{r[0]}={r[1]}" for r in c_rows]) if c_rows else "<none>"
+        complete_str = ", ".join([f"{k}={v}" for k, v in zip(comp_flags, comp_counts)]) if comp_flags else "<none>"
 
     unit_note = ""
     try:
-        ts_type = _column_db_type(engine, ts_col)
+        ts_type = _column_db_type(bind, ts_col)
         if ts_type in {"bigint", "integer", "smallint"}:
-            unit = infer_epoch_unit_strict(engine, ts_col)
+            unit = cached_epoch_unit(bind, ts_col)
             unit_note = f"  inferred_epoch_unit={unit} (threshold={EPOCH_MS_THRESHOLD})\n"
     except Exception as e:
         unit_note = f"  inferred_epoch_unit=<error: {e}>\n"
@@ -269,7 +329,183 @@ def _diagnose_empty(engine: Engine, symbols: List[str], timeframe: str, ts_col:
     )
 
 
-def history(engine: Engine, q: BarsQuery) -> pd.DataFrame:
+def _read_frame_copy(bind: Bind, sql: str, params: dict) -> pd.DataFrame:
+    """
+    Run a select through COPY (...) TO STDOUT as CSV and parse it with pandas'
+    C reader, instead of materializing one Python tuple per row via read_sql.
+    The session options it sets are transaction-local, so bind should be an
+    Engine or a connection dedicated to this read.
+
+    Values are identical to the read_sql path: doubles are emitted with
+    extra_float_digits=3 (exact) and parsed round-trip; numeric text parses to
+    the correctly rounded float, as float(Decimal) does; timestamps are ISO with
+    an offset. Requires the psycopg driver.
+    """
+    if bind.dialect.driver != "psycopg":
+        raise RuntimeError(f"COPY bars read requires the psycopg driver (got {bind.dialect.driver!r}).")
+    # :name binds -> the driver's %(name)s style; psycopg merges them client-side for COPY.
+    select_sql = str(text(sql).compile(dialect=bind.dialect))
+    buf = io.BytesIO()
+    with connect_scope(bind) as cxn:
+        with cxn.connection.driver_connection.cursor() as cur:
+            # Transaction-local; rolled back when the connection returns to the pool.
+            cur.execute("select set_config('extra_float_digits', '3', true), set_config('datestyle', 'ISO, YMD', true)")
+            with cur.copy(f"copy ({select_sql}) to stdout with (format csv, header true)", params) as cp:
+                for block in cp:
+                    buf.write(block)
+    buf.seek(0)
+    df = pd.read_csv(
+        buf,
+        dtype={"symbol": str},
+        keep_default_na=False,
+        na_values=[""],
+        float_precision="round_trip",
+        encoding="utf-8",
+    )
+    if "ts_utc" in df.columns:
+        df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True, format="ISO8601")
+    return df
+
+
+# Rows per fetch when streaming bars through read_sql.
+_READ_CHUNK_ROWS = 100_000
+
+
+def _read_frame(bind: Bind, sql: str, params: dict, via_copy: bool) -> pd.DataFrame:
+    if via_copy:
+        # COPY sets transaction-local session options; keep them off a shared
+        # caller connection by running it on its own pooled one.
+        return _read_frame_copy(bind.engine, sql, params)
+    # Stream through a server-side cursor in bounded chunks, which avoids holding
+    # all row tuples at once. history() re-types every column after the read, so
+    # a chunk whose column inferred a different dtype (e.g. all-NULL -> object)
+    # ends up with the same values as a single read.
+    stmt = text(sql).execution_options(stream_results=True)
+    with connect_scope(bind) as cxn:
+        return _concat_chunks(iter(pd.read_sql(stmt, cxn, params=params, chunksize=_READ_CHUNK_ROWS)))
+
+
+def _concat_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate row chunks as pd.concat(chunks, ignore_index=True) would, with a
+    lower peak: each chunk's columns are copied out as arrays so the chunk can be
+    released, then each column is joined and its pieces dropped before the next.
+    Peak memory is about the final frame plus one column and two chunks, not two
+    full frames. A lone chunk is returned as-is.
+    """
+    chunk = next(chunks, None)
+    if chunk is None:
+        return pd.DataFrame()
+    pending = next(chunks, None)
+    if pending is None:
+        return chunk
+    pieces: Dict[str, list] = {}
+    while chunk is not None:
+        for name, col in chunk.items():
+            pieces.setdefault(name, []).append(col.array.copy())
+        chunk, pending = pending, (next(chunks, None) if pending is not None else None)
+    columns = {}
+    for name in list(pieces):
+        parts = pieces.pop(name)
+        columns[name] = pd.concat([pd.Series(p, copy=False) for p in parts], ignore_index=True).array
+        del parts
+    # copy=False keeps each joined column as its own block (no consolidating copy).
+    return pd.DataFrame(columns, copy=False)
+
+
+# pg_export_snapshot() ids are hex fields joined by dashes, e.g. 00000003-0000001B-1.
+_SNAPSHOT_ID = re.compile(r"[0-9A-Fa-f]+(?:-[0-9A-Fa-f]+)+")
+
+
+@contextmanager
+def _snapshot_connections(engine: Engine, n: int) -> Iterator[List[Connection]]:
+    """
+    Yield n pooled connections whose transactions all read one snapshot.
+
+    The first opens a REPEATABLE READ transaction and exports its snapshot; the
+    others adopt it with SET TRANSACTION SNAPSHOT before running anything, so
+    concurrent reads see md_bars as of one point in time, as a single query
+    would. Every transaction (the exporting one included) stays open until all
+    connections are released.
+    """
+    with ExitStack() as stack:
+        def _open() -> Connection:
+            cxn = stack.enter_context(engine.connect())
+            return cxn.execution_options(isolation_level="REPEATABLE READ")
+
+        lead = _open()
+        snapshot = str(lead.execute(text("select pg_export_snapshot()")).scalar_one())
+        if not _SNAPSHOT_ID.fullmatch(snapshot):
+            raise RuntimeError(f"unexpected pg_export_snapshot() id: {snapshot!r}")
+        cxns = [lead]
+        for _ in range(n - 1):
+            cxn = _open()
+            # SET takes no bind parameters; the id was validated above.
+            cxn.exec_driver_sql(f"set transaction snapshot '{snapshot}'")
+            cxns.append(cxn)
+        yield cxns
+
+
+def _read_bars_partitioned(
+    bind: Bind,
+    sql: str,
+    params: dict,
+    symbols: List[str],
+    partitions: int,
+    *,
+    via_copy: bool = False,
+) -> pd.DataFrame:
+    """
+    Run the bars query, optionally split into contiguous groups of the (sorted)
+    symbol list read concurrently on separate pooled connections (of bind's
+    engine). A single query runs on bind itself.
+
+    The group connections share one exported snapshot (_snapshot_connections),
+    so rows ingested while the groups run are seen by none of them, as with a
+    single query. Each group is ordered by (symbol, ts) and the groups are
+    disjoint, ascending ranges of symbols, so concatenating in group order
+    reproduces the single-query frame.
+    """
+    n = min(int(partitions), len(symbols))
+    if n <= 1:
+        return _read_frame(bind, sql, params, via_copy)
+
+    size = -(-len(symbols) // n)
+    groups = [symbols[i : i + size] for i in range(0, len(symbols), size)]
+
+    def _read(cxn: Connection, group: List[str]) -> pd.DataFrame:
+        group_params = {**params, "symbols": group}
+        # Each connection is dedicated to its group, so COPY runs on it directly
+        # (leaving it would leave the shared snapshot).
+        if via_copy:
+            return _read_frame_copy(cxn, sql, group_params)
+        return _read_frame(cxn, sql, group_params, via_copy=False)
+
+    with _snapshot_connections(bind.engine, len(groups)) as cxns:
+        with ThreadPoolExecutor(max_workers=len(groups)) as ex:
+            parts = list(ex.map(_read, cxns, groups))
+
+    # Empty groups carry object dtypes; keep them out of the concat.
+    nonempty = [p for p in parts if not p.empty]
+    if not nonempty:
+        return parts[0]
+    return pd.concat(nonempty, ignore_index=True)
+
+
+def history(bind: Bind, q: BarsQuery, *, partitions: int = 1, via_copy: bool = False) -> pd.DataFrame:
+    """
+    Load bars for q.symbols in [start_utc, end_utc) at q.timeframe.
+
+    Schema introspection, the bars query and the empty-result diagnostics share
+    one connection: bind itself if it is a Connection, else one checked out of
+    the engine's pool for the duration of the load.
+
+    partitions > 1 splits the read by symbol across that many concurrent
+    connections sharing one snapshot (see _read_bars_partitioned); the result
+    is identical.
+    via_copy streams rows with COPY ... CSV instead of read_sql (see
+    _read_frame_copy); the result is identical.
+    """
     if not q.symbols:
         raise ValueError("symbols must be non-empty")
 
@@ -284,106 +520,116 @@ def history(engine: Engine, q: BarsQuery) -> pd.DataFrame:
     if not symbols:
         raise ValueError("symbols must contain at least one non-empty symbol")
 
-    cols = _load_md_bars_columns(engine)
-    colset = set(cols)
-
-    if "timeframe" not in colset:
-        raise RuntimeError("md_bars missing 'timeframe' column; cannot enforce explicit timeframe")
-    if "symbol" not in colset:
-        raise RuntimeError("md_bars missing 'symbol' column")
-
-    ts_col, open_col, high_col, low_col, close_col, volume_col, has_is_complete = _detect_md_bars_schema(engine)
-
-    # Optional quality gate: require complete bars if that flag exists.
-    complete_clause = "and is_complete = true" if has_is_complete else ""
-
-    # Decide whether ts_col is epoch integer or timestamptz-like.
-    ts_type = _column_db_type(engine, ts_col)
-    is_integer_ts = ts_type in {"bigint", "integer", "smallint"}
-
-    if is_integer_ts:
-        epoch_unit = infer_epoch_unit_strict(engine, ts_col)
-        start_bound = _to_epoch_bound(start_utc, epoch_unit)
-        end_bound = _to_epoch_bound(end_utc, epoch_unit)
-
-        sql = f"""
-        select
-          symbol,
-          {ts_col} as ts_raw,
-          {open_col} as open_raw,
-          {high_col} as high_raw,
-          {low_col} as low_raw,
-          {close_col} as close_raw,
-          {volume_col} as volume
-        from md_bars
-        where symbol = any(:symbols)
-          and {ts_col} >= :start_bound
-          and {ts_col} < :end_bound
-          and timeframe = :timeframe
-          {complete_clause}
-        order by symbol asc, {ts_col} asc
-        """
-
-        params = {
-            "symbols": symbols,
-            "start_bound": start_bound,
-            "end_bound": end_bound,
-            "timeframe": q.timeframe,
-        }
-
-        with engine.connect() as cxn:
-            df = pd.read_sql(text(sql), cxn, params=params)
-
-        if df.empty:
-            raise RuntimeError(_diagnose_empty(engine, symbols, q.timeframe, ts_col, has_is_complete))
-
-        df["symbol"] = df["symbol"].astype(str).str.upper()
-        df["ts_utc"] = _epoch_series_to_utc(df["ts_raw"], epoch_unit)
-        df = df.drop(columns=["ts_raw"])
+    with connect_scope(bind) as cxn:
+        cols = _load_md_bars_columns(cxn)
+        colset = set(cols)
+
+        if "timeframe" not in colset:
+            raise RuntimeError("md_bars missing 'timeframe' column; cannot enforce explicit timeframe")
+        if "symbol" not in colset:
+            raise RuntimeError("md_bars missing 'symbol' column")
+
+        ts_col, open_col, high_col, low_col, close_col, volume_col, has_is_complete = _detect_md_bars_schema(cxn)
+
+        # Optional quality gate: require complete bars if that flag exists.
+        complete_clause = "and is_complete = true" if has_is_complete else ""
+
+        # Decide whether ts_col is epoch integer or timestamptz-like.
+        ts_type = _column_db_type(cxn, ts_col)
+        is_integer_ts = ts_type in {"bigint", "integer", "smallint"}
+
+        # Both queries below keep ts_col bare and compare it to precomputed bounds
+        # (epoch integers or timestamptz), so the range predicate stays sargable.
+        # A b-tree matching the filter and the ORDER BY turns the read into one
+        # ordered range scan per symbol with no sort step, e.g.
+        #   create index on md_bars (symbol, timeframe, <ts_col>);
+        # Indexes are left to the operator (this path may run as a read-only role);
+        # `preflight` lists the ones present.
+        if is_integer_ts:
+            epoch_unit = cached_epoch_unit(cxn, ts_col)
+            start_bound = _to_epoch_bound(start_utc, epoch_unit)
+            end_bound = _to_epoch_bound(end_utc, epoch_unit)
+
+            sql = f"""
+            select
+              symbol,
+              {ts_col} as ts_raw,
+              {open_col} as open_raw,
+              {high_col} as high_raw,
+              {low_col} as low_raw,
+              {close_col} as close_raw,
+              {volume_col} as volume
+            from md_bars
+            where symbol = any(:symbols)
+              and {ts_col} >= :start_bound
+              and {ts_col} < :end_bound
+              and timeframe = :timeframe
+              {complete_clause}
+            order by symbol asc, {ts_col} asc
+            """
 
-    else:
-        # Timestamptz-ish path
-        sql = f"""
-        select
-          symbol,
-          {ts_col} as ts_utc,
-          {open_col} as open_raw,
-          {high_col} as high_raw,
-          {low_col} as low_raw,
-          {close_col} as close_raw,
-          {volume_col} as volume
-        from md_bars
-        where symbol = any(:symbols)
-          and {ts_col} >= :start_utc
-          and {ts_col} < :end_utc
-          and timeframe = :timeframe
-          {complete_clause}
-        order by symbol asc, {ts_col} asc
-        """
+            params = {
+                "symbols": symbols,
+                "start_bound": start_bound,
+                "end_bound": end_bound,
+                "timeframe": q.timeframe,
+            }
+
+            df = _read_bars_partitioned(cxn, sql, params, symbols, partitions, via_copy=via_copy)
+
+            if df.empty:
+                raise RuntimeError(_diagnose_empty(cxn, symbols, q.timeframe, ts_col, has_is_complete))
+
+            df["ts_utc"] = _epoch_series_to_utc(df["ts_raw"], epoch_unit)
+            df = df.drop(columns=["ts_raw"])
+
+        else:
+            # Timestamptz-ish path
+            sql = f"""
+            select
+              symbol,
+              {ts_col} as ts_utc,
+              {open_col} as open_raw,
+              {high_col} as high_raw,
+              {low_col} as low_raw,
+              {close_col} as close_raw,
+              {volume_col} as volume
+            from md_bars
+            where symbol = any(:symbols)
+              and {ts_col} >= :start_utc
+              and {ts_col} < :end_utc
+              and timeframe = :timeframe
+              {complete_clause}
+            order by symbol asc, {ts_col} asc
+            """
 
-        params = {
-            "symbols": symbols,
-            "start_utc": start_utc.to_pydatetime(),
-            "end_utc": end_utc.to_pydatetime(),
-            "timeframe": q.timeframe,
-        }
-
-        with engine.connect() as cxn:
-            df = pd.read_sql(text(sql), cxn, params=params)
-
-        if df.empty:
-            raise RuntimeError(_diagnose_empty(engine, symbols, q.timeframe, ts_col, has_is_complete))
-
-        df["symbol"] = df["symbol"].astype(str).str.upper()
-        df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True)
-
-    # Convert OHLCV deterministically
-    df["open"] = _to_price_float(df["open_raw"], open_col)
-    df["high"] = _to_price_float(df["high_raw"], high_col)
-    df["low"] = _to_price_float(df["low_raw"], low_col)
-    df["close"] = _to_price_float(df["close_raw"], close_col)
-    df["volume"] = df["volume"].astype(float)
-    df = df.drop(columns=["open_raw", "high_raw", "low_raw", "close_raw"])
+            params = {
+                "symbols": symbols,
+                "start_utc": start_utc.to_pydatetime(),
+                "end_utc": end_utc.to_pydatetime(),
+                "timeframe": q.timeframe,
+            }
+
+            df = _read_bars_partitioned(cxn, sql, params, symbols, partitions, via_copy=via_copy)
+
+            if df.empty:
+                raise RuntimeError(_diagnose_empty(cxn, symbols, q.timeframe, ts_col, has_is_complete))
+
+            df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True)
+
+        # Convert OHLCV deterministically
+        df["open"] = _to_price_float(df["open_raw"], open_col)
+        df["high"] = _to_price_float(df["high_raw"], high_col)
+        df["low"] = _to_price_float(df["low_raw"], low_col)
+        df["close"] = _to_price_float(df["close_raw"], close_col)
+        df["volume"] = df["volume"].astype(float)
+        df = df.drop(columns=["open_raw", "high_raw", "low_raw", "close_raw"])
+
+    # Symbols repeat on every bar: store them as a categorical (categories sorted,
+    # so code order is symbol order). The sort below and downstream grouping then
+    # compare int codes instead of strings. Prices stay float64: Phase 1 writes
+    # them (and features derived from them) unrounded into hashed artifacts.
+    df["symbol"] = _upper_symbol_category(df["symbol"])
 
     # Deterministic ordering
     df = df.sort_values(["symbol", "ts_utc"], kind="mergesort").reset_index(drop=True)
@@ -3,7 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
+from pandas.api.indexers import BaseIndexer
 
 
 @dataclass(frozen=True)
@@ -15,11 +17,33 @@ class FeatureConfig:
     ma_slow: int = 50
 
 
-def _true_range(high: pd.Series, low: pd.Series, prev_close: pd.Series) -> pd.Series:
-    a = (high - low).abs()
-    b = (high - prev_close).abs()
-    c = (low - prev_close).abs()
-    return pd.concat([a, b, c], axis=1).max(axis=1)
+def _true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    a = np.abs(high - low)
+    b = np.abs(high - prev_close)
+    c = np.abs(low - prev_close)
+    # fmax skips NaN like DataFrame.max(axis=1) (all-NaN rows stay NaN).
+    return np.fmax(np.fmax(a, b), c)
+
+
+def _run_starts(codes: np.ndarray) -> np.ndarray:
+    """For each row of sorted group codes, the position where its group's run begins."""
+    is_start = np.ones(len(codes), dtype=bool)
+    is_start[1:] = codes[1:] != codes[:-1]
+    return np.maximum.accumulate(np.where(is_start, np.arange(len(codes)), 0))
+
+
+class _SymbolRunIndexer(BaseIndexer):
+    """
+    Trailing fixed windows that never reach back past the start of the row's
+    symbol run. The bounds are exactly those groupby().rolling() builds per
+    group, so the rolling kernel produces the same values, without regrouping
+    (and re-factorizing) the keys for every rolling call.
+    """
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.run_starts).astype(np.int64)
+        return start, end
 
 
 def compute_daily_features(bars: pd.DataFrame, cfg: FeatureConfig) -> pd.DataFrame:
@@ -39,59 +63,84 @@ def compute_daily_features(bars: pd.DataFrame, cfg: FeatureConfig) -> pd.DataFra
     if missing:
         raise ValueError(f"bars missing required columns: {sorted(missing)}")
 
-    df = bars.copy()
-    df["symbol"] = df["symbol"].astype(str).str.upper()
-    df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True)
-    df = df.sort_values(["symbol", "ts_utc"], kind="mergesort").reset_index(drop=True)
-
-    out_parts = []
-    for sym, g in df.groupby("symbol", sort=True):
-        g = g.sort_values("ts_utc", kind="mergesort").reset_index(drop=True)
-
-        close = g["close"].astype(float)
-        high = g["high"].astype(float)
-        low = g["low"].astype(float)
-        volume = g["volume"].astype(float)
-
+    # Symbols are normalized once per distinct value, not per bar: factorize,
+    # upper-case the uniques, and re-factorize them sorted so the int codes are in
+    # symbol order (case variants merge, as per-row upper-casing would merge them).
+    raw_codes, raw_uniques = pd.factorize(bars["symbol"], use_na_sentinel=False)
+    upper = pd.Index(raw_uniques).astype(str).str.upper()
+    upper_codes, symbols = pd.factorize(upper, sort=True)
+    codes = upper_codes[raw_codes]
+
+    # Stable (symbol, ts_utc) order with NaT last, as sort_values(kind="mergesort").
+    # Input columns are only read, and ts_utc is converted only when it is not
+    # already UTC-aware. The assign below shares the input's columns only when
+    # copy-on-write is on (the pandas 3 default); on pandas 2 without it,
+    # assign deep-copies the frame.
+    ts_utc = bars["ts_utc"]
+    if not (isinstance(ts_utc.dtype, pd.DatetimeTZDtype) and str(ts_utc.dtype.tz) == "UTC"):
+        ts_utc = pd.to_datetime(ts_utc, utc=True)
+    ts_key = ts_utc.array.asi8.copy()
+    ts_key[ts_utc.isna().to_numpy()] = np.iinfo(np.int64).max
+    order = np.lexsort((ts_key, codes))
+
+    # The only full take of the input (beyond assign's copy on pandas 2 without
+    # copy-on-write); everything below reads this sorted frame.
+    # history() already returns bars in this order, in which case the take (a
+    # copy of every column) is skipped.
+    df = bars.assign(symbol=pd.Series(symbols.take(codes), index=bars.index), ts_utc=ts_utc)
+    if (order[1:] > order[:-1]).all():
+        df = df.reset_index(drop=True)
+    else:
+        df = df.take(order).reset_index(drop=True)
+        codes = codes[order]
+
+    # Whole-frame kernels over contiguous symbol runs instead of a Python loop
+    # over per-symbol frames and a final concat. Lags never cross into the
+    # previous symbol and the rolling windows restart at each run, so every value
+    # is bit-identical to running the same op on that symbol's slice alone.
+    n = len(df)
+    close = df["close"].to_numpy(dtype=np.float64)
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    volume = df["volume"].to_numpy(dtype=np.float64)
+    run_starts = _run_starts(codes)
+    pos = np.arange(n)
+
+    def _lag(a: np.ndarray, periods: int) -> np.ndarray:
+        out = np.full(n, np.nan)
+        src = pos - periods
+        ok = src >= run_starts
+        out[ok] = a[src[ok]]
+        return out
+
+    def _rolling_mean(a: np.ndarray, window: int) -> np.ndarray:
+        indexer = _SymbolRunIndexer(window_size=window, run_starts=run_starts)
+        return pd.Series(a).rolling(indexer, min_periods=window).mean().to_numpy()
+
+    # Output columns are filled straight into per-feature arrays under their
+    # final (canonical) names, then attached to the surviving rows in one step.
+    atr_name = f"atr_pct_{cfg.atr_window}"
+    adv_name = f"adv_usd_{cfg.adv_window}"
+    features = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
         for w in cfg.ret_windows:
-            g[f"ret_{w}d"] = close.pct_change(w)
-
-        prev_close = close.shift(1)
-        tr = _true_range(high, low, prev_close)
-        atr = tr.rolling(cfg.atr_window, min_periods=cfg.atr_window).mean()
-        g[f"atr_pct_{cfg.atr_window}"] = atr / close
-
-        dollar_vol = close * volume
-        g[f"adv_usd_{cfg.adv_window}"] = dollar_vol.rolling(cfg.adv_window, min_periods=cfg.adv_window).mean()
-
-        ma_fast = close.rolling(cfg.ma_fast, min_periods=cfg.ma_fast).mean()
-        ma_slow = close.rolling(cfg.ma_slow, min_periods=cfg.ma_slow).mean()
-        g[f"ma_{cfg.ma_fast}"] = ma_fast
-        g[f"ma_{cfg.ma_slow}"] = ma_slow
-        g["trend_proxy"] = (ma_fast / ma_slow) - 1.0
+            features[f"ret_{w}d"] = (close / _lag(close, w)) - 1
 
-        out_parts.append(g)
+        tr = _true_range(high, low, _lag(close, 1))
+        features[atr_name] = _rolling_mean(tr, cfg.atr_window) / close
+        features[adv_name] = _rolling_mean(close * volume, cfg.adv_window)
 
-    out = pd.concat(out_parts, axis=0, ignore_index=True)
+        ma_fast = _rolling_mean(close, cfg.ma_fast)
+        ma_slow = _rolling_mean(close, cfg.ma_slow)
+        features[f"ma_{cfg.ma_fast}"] = ma_fast
+        features[f"ma_{cfg.ma_slow}"] = ma_slow
+        features["trend_proxy"] = (ma_fast / ma_slow) - 1.0
 
     # Keep only rows where core windows exist (prevents silent NaNs).
-    core_cols = [
-        "ret_1d",
-        "ret_5d",
-        "ret_20d",
-        "ret_60d",
-        f"atr_pct_{cfg.atr_window}",
-        f"adv_usd_{cfg.adv_window}",
-        "trend_proxy",
-    ]
-    out = out.dropna(subset=core_cols).reset_index(drop=True)
+    core_cols = ["ret_1d", "ret_5d", "ret_20d", "ret_60d", atr_name, adv_name, "trend_proxy"]
+    keep = ~np.isnan(np.column_stack([features[c] for c in core_cols])).any(axis=1)
 
     # Normalize canonical names required downstream in Phase 1.
-    out = out.rename(
-        columns={
-            f"atr_pct_{cfg.atr_window}": "atr_pct_20",
-            f"adv_usd_{cfg.adv_window}": "adv_usd_20",
-        }
-    )
-
-    return out
\ No newline at end of file
+    canonical = {atr_name: "atr_pct_20", adv_name: "adv_usd_20"}
+    out = df.loc[keep].reset_index(drop=True)
+    return out.assign(**{canonical.get(c, c): a[keep] for c, a in features.items()})
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Literal, Optional
+from typing import Callable, Dict, Iterable, List, Literal, Optional
 
 
 AssetClass = Literal["EQUITY", "OPTIONS", "FUTURES"]
@@ -62,6 +62,53 @@ def future_id(root: str, contract: str) -> str:
     return f"FUTURE::{root.upper()}::{contract.upper()}"
 
 
+def _build_equity(instrument_id: str, parts: List[str]) -> Instrument:
+    if len(parts) != 2:
+        raise ValueError(f"Invalid equity instrument_id: {instrument_id}")
+    sym = parts[1]
+    return EquityInstrument(instrument_id=f"EQUITY::{sym}", symbol=sym)
+
+
+def _build_option(instrument_id: str, parts: List[str]) -> Instrument:
+    # OPTION::<UNDERLYING>::<YYYYMMDD>::<C|P>::<STRIKE>
+    if len(parts) != 6:
+        raise ValueError(f"Invalid option instrument_id: {instrument_id}")
+    under = parts[1]
+    sym = under  # symbol field stores underlying for now
+    # Expiry and strike are taken as written (only name fields are upper-cased),
+    # so a malformed strike fails with the caller's own text.
+    raw = parts if instrument_id.isupper() else instrument_id.split("::")
+    return OptionInstrument(
+        instrument_id=instrument_id,
+        symbol=sym,
+        underlying=under,
+        expiry_yyyymmdd=raw[2],
+        right=parts[3],  # type: ignore[arg-type]  # C/P
+        strike=float(raw[4]),
+    )
+
+
+def _build_future(instrument_id: str, parts: List[str]) -> Instrument:
+    # FUTURE::<ROOT>::<CONTRACT>
+    if len(parts) != 3:
+        raise ValueError(f"Invalid future instrument_id: {instrument_id}")
+    root = parts[1]
+    sym = root
+    return FutureInstrument(
+        instrument_id=instrument_id,
+        symbol=sym,
+        root=root,
+        contract=parts[2],
+    )
+
+
+_BUILDERS: Dict[str, Callable[[str, List[str]], Instrument]] = {
+    "EQUITY": _build_equity,
+    "OPTION": _build_option,
+    "FUTURE": _build_future,
+}
+
+
 def parse_instrument_id(instrument_id: str) -> Instrument:
     """
     Parse deterministic instrument ids. Used for artifact sanity and future multi-asset.
@@ -70,45 +117,17 @@ def parse_instrument_id(instrument_id: str) -> Instrument:
     if not instrument_id or "::" not in instrument_id:
         raise ValueError(f"Invalid instrument_id: {instrument_id}")
 
-    parts = instrument_id.split("::")
-    tag = parts[0].upper()
-
-    if tag == "EQUITY":
-        if len(parts) != 2:
-            raise ValueError(f"Invalid equity instrument_id: {instrument_id}")
-        sym = parts[1].upper()
-        return EquityInstrument(instrument_id=equity_id(sym), symbol=sym)
-
-    if tag == "OPTION":
-        # OPTION::<UNDERLYING>::<YYYYMMDD>::<C|P>::<STRIKE>
-        if len(parts) != 6:
-            raise ValueError(f"Invalid option instrument_id: {instrument_id}")
-        under = parts[1].upper()
-        yyyymmdd = parts[2]
-        right = parts[3].upper()  # C/P
-        strike = float(parts[4])
-        sym = under  # symbol field stores underlying for now
-        return OptionInstrument(
-            instrument_id=instrument_id,
-            symbol=sym,
-            underlying=under,
-            expiry_yyyymmdd=yyyymmdd,
-            right=right,  # type: ignore[arg-type]
-            strike=strike,
-        )
-
-    if tag == "FUTURE":
-        # FUTURE::<ROOT>::<CONTRACT>
-        if len(parts) != 3:
-            raise ValueError(f"Invalid future instrument_id: {instrument_id}")
-        root = parts[1].upper()
-        contract = parts[2].upper()
-        sym = root
-        return FutureInstrument(
-            instrument_id=instrument_id,
-            symbol=sym,
-            root=root,
-            contract=contract,
-        )
-
-    raise ValueError(f"Unknown instrument tag in instrument_id: {instrument_id}")
\ No newline at end of file
+    # The *_id() helpers emit upper-case ids, so the upper-casing of tag and
+    # name fields is done once for the whole id, and only when it is needed
+    # (digits and separators are unaffected by upper()).
+    norm = instrument_id if instrument_id.isupper() else instrument_id.upper()
+    parts = norm.split("::")
+    build = _BUILDERS.get(parts[0])
+    if build is None:
+        raise ValueError(f"Unknown instrument tag in instrument_id: {instrument_id}")
+    return build(instrument_id, parts)
+
+
+def parse_many(instrument_ids: Iterable[str]) -> List[Instrument]:
+    """parse_instrument_id over a batch of ids (e.g. a full universe), in order."""
+    return [parse_instrument_id(iid) for iid in instrument_ids]
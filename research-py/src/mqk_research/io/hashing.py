@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+import io
 from pathlib import Path
-from typing import Union
+from typing import BinaryIO, Optional, Union
 
 BytesLike = Union[bytes, bytearray, memoryview]
 
@@ -14,8 +15,42 @@ def sha256_bytes(data: BytesLike) -> str:
 
 
 def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
     with path.open("rb") as f:
+        # Python 3.11+: hashlib.file_digest drives a single OpenSSL context over
+        # the file with zero-copy readinto (SHA-NI where the CPU has it).
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(1024 * 1024), b""):
             h.update(chunk)
-    return h.hexdigest()
\ No newline at end of file
+        return h.hexdigest()
+
+
+class HashingWriter(io.RawIOBase):
+    """
+    Write-only byte sink that feeds every write into a running sha256.
+
+    If `target` is given, bytes are forwarded to it as well, so a serializer
+    can produce a file and its digest in a single pass. With no target the
+    bytes are hashed and discarded (no in-memory image of the payload).
+    """
+
+    def __init__(self, target: Optional[BinaryIO] = None) -> None:
+        super().__init__()
+        self._h = hashlib.sha256()
+        self._target = target
+        self.nbytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: BytesLike) -> int:
+        mv = memoryview(b)
+        self._h.update(mv)
+        if self._target is not None:
+            self._target.write(mv)
+        self.nbytes += mv.nbytes
+        return mv.nbytes
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
@@ -48,4 +48,13 @@ def file_record(path: Path) -> Dict[str, Any]:
         "path": str(path),
         "sha256": sha256_file(path),
         "bytes": path.stat().st_size,
-    }
\ No newline at end of file
+    }
+
+
+def file_record_with_sha(path: Path, sha256: str, nbytes: int) -> Dict[str, Any]:
+    """file_record for a digest captured while writing (avoids re-reading the file)."""
+    return {
+        "path": str(path),
+        "sha256": sha256,
+        "bytes": int(nbytes),
+    }
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
+from typing import Iterator, Union
 
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+
+# Either an Engine (a pooled connection is checked out per use) or a caller-owned
+# Connection (reused as-is, so several helpers share one round-trip channel).
+Bind = Union[Engine, Connection]
 
 
 @dataclass(frozen=True)
@@ -20,7 +26,21 @@ def make_engine(cfg: PgConfig) -> Engine:
     return create_engine(cfg.url, future=True, pool_pre_ping=True)
 
 
-def table_exists(engine: Engine, table_name: str, schema: str = "public") -> bool:
+@contextmanager
+def connect_scope(bind: Bind) -> Iterator[Connection]:
+    """
+    Yield a connection for `bind`.
+    A Connection is yielded as-is and left open (its owner closes it);
+    an Engine checks out a pooled connection for the duration of the block.
+    """
+    if isinstance(bind, Connection):
+        yield bind
+        return
+    with bind.connect() as cxn:
+        yield cxn
+
+
+def table_exists(bind: Bind, table_name: str, schema: str = "public") -> bool:
     q = text(
         """
         select 1
@@ -29,6 +49,6 @@ def table_exists(engine: Engine, table_name: str, schema: str = "public") -> boo
         limit 1
         """
     )
-    with engine.connect() as cxn:
+    with connect_scope(bind) as cxn:
         row = cxn.execute(q, {"schema": schema, "table": table_name}).fetchone()
-        return row is not None
\ No newline at end of file
+        return row is not None
@@ -25,8 +25,10 @@ def build_targets_long_only_equal_weight(universe: pd.DataFrame, policy: Dict) -
     if top_n > max_pos:
         top_n = max_pos
 
-    df = universe.copy()
-    df = df[df["included"] == True].copy()
+    # Select only the columns the targets need from the included rows (one
+    # narrow frame); the sort and head then never touch the feature columns.
+    cols = ["rank", "symbol", "instrument_id", "asset_class"]
+    df = universe.loc[universe["included"] == True, cols]
     df = df.sort_values(["rank", "symbol"], kind="mergesort").head(top_n).reset_index(drop=True)
 
     if df.empty:
@@ -3,9 +3,25 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
 
 
+UNIVERSE_COLUMNS = (
+    "instrument_id",
+    "symbol",
+    "asset_class",
+    "rank",
+    "included",
+    "adv_usd_20",
+    "atr_pct_20",
+    "ret_60d",
+    "trend_proxy",
+    "earnings_within_14d",
+    "score",
+)
+
+
 @dataclass(frozen=True)
 class UniverseResult:
     df: pd.DataFrame
@@ -33,78 +49,87 @@ def build_universe_swing_v1(
     if missing:
         raise ValueError(f"features missing required columns for universe: {sorted(missing)}")
 
-    df = features.copy()
-    df["symbol"] = df["symbol"].astype(str).str.upper()
-    df["ts_utc"] = pd.to_datetime(df["ts_utc"], utc=True)
-    df = df.sort_values(["symbol", "ts_utc"], kind="mergesort")
-
-    # ASOF per symbol = last row in window.
-    asof = df.groupby("symbol", sort=True).tail(1).reset_index(drop=True)
+    # ASOF per symbol = last row of a stable (symbol, ts_utc) sort with NaT last,
+    # i.e. the row with the greatest ts_utc (NaT counting as greatest), latest
+    # position winning ties. Symbols are upper-cased once per distinct value and
+    # sorted into int codes, so both maxima are O(n) grouped reductions and the
+    # features frame is never sorted; only the ASOF rows of the columns used
+    # below are materialized.
+    raw_codes, raw_uniques = pd.factorize(features["symbol"], use_na_sentinel=False)
+    upper = pd.Index(raw_uniques).astype(str).str.upper()
+    upper_codes, symbols = pd.factorize(upper, sort=True)
+    codes = upper_codes[raw_codes]
+
+    ts_utc = pd.to_datetime(features["ts_utc"], utc=True)
+    ts_key = ts_utc.array.asi8.copy()
+    ts_key[ts_utc.isna().to_numpy()] = np.iinfo(np.int64).max
+
+    max_key = np.full(len(symbols), np.iinfo(np.int64).min)
+    np.maximum.at(max_key, codes, ts_key)
+    at_max = np.flatnonzero(ts_key == max_key[codes])
+    last = np.full(len(symbols), -1, dtype=np.intp)
+    np.maximum.at(last, codes[at_max], at_max)
+
+    asof = features[["close", "adv_usd_20", "atr_pct_20", "ret_60d", "trend_proxy"]].take(last)
+    asof = asof.reset_index(drop=True)
+    asof.insert(0, "symbol", symbols.take(codes[last]))
 
     # Earnings exclusion (stub allowed if missing).
     stubbed = False
+    earnings = np.zeros(len(asof), dtype=bool)
     if earnings_flags is None:
-        asof["earnings_within_14d"] = False
         stubbed = True
     else:
-        ef = earnings_flags.copy()
-        ef["symbol"] = ef["symbol"].astype(str).str.upper()
-        ef = ef[["symbol", "earnings_within_14d"]].drop_duplicates(subset=["symbol"]).reset_index(drop=True)
-        asof = asof.merge(ef, on="symbol", how="left")
-        asof["earnings_within_14d"] = asof["earnings_within_14d"].fillna(False).astype(bool)
+        # Matched by symbol code instead of a string merge: ASOF row i is
+        # symbols[i]. Earnings symbols are upper-cased once per distinct value,
+        # and the first flag per symbol wins (as drop_duplicates kept it).
+        # Missing flags read as False in the same pass as the bool conversion.
+        ef_codes, ef_uniques = pd.factorize(earnings_flags["symbol"], use_na_sentinel=False)
+        pos = symbols.get_indexer(pd.Index(ef_uniques).astype(str).str.upper())[ef_codes]
+        first = (pos >= 0) & ~pd.Series(pos).duplicated().to_numpy()
+        flags = earnings_flags["earnings_within_14d"].to_numpy(dtype=bool, na_value=False)
+        earnings[pos[first]] = flags[first]
+    asof["earnings_within_14d"] = earnings
 
     # Deterministic filters.
     min_price = float(p_filters["min_price"])
     min_adv = float(p_filters["min_adv_usd_20"])
 
-    included = pd.Series(True, index=asof.index)
-    included &= asof["close"].astype(float) > min_price
-    included &= asof["adv_usd_20"].astype(float) > min_adv
-    included &= ~asof["earnings_within_14d"].astype(bool)
-    asof["included"] = included
+    # Masks are combined as numpy arrays (no intermediate Series). float64 is kept:
+    # filters compare against exact thresholds and score is written to 8 dp.
+    close = asof["close"].to_numpy(dtype=np.float64)
+    adv = asof["adv_usd_20"].to_numpy(dtype=np.float64)
+    asof["included"] = (close > min_price) & (adv > min_adv) & ~earnings
 
     # Score (Phase 1 fixed formula; policy carries string for audit only).
-    asof["score"] = asof["ret_60d"].astype(float) + asof["trend_proxy"].astype(float)
-
-    ranked = asof[asof["included"]].copy()
-    ranked = ranked.sort_values(["score", "symbol"], ascending=[False, True], kind="mergesort").reset_index(drop=True)
+    asof["score"] = asof["ret_60d"].to_numpy(dtype=np.float64) + asof["trend_proxy"].to_numpy(dtype=np.float64)
 
+    # Rank by (score desc, symbol asc), NaN scores last, keeping top_k. ASOF rows
+    # are in symbol order, so row position is the symbol tie-break and a stable
+    # sort on -score alone reproduces that order. Only the rows that can make
+    # the cut are sorted: everything at or above the top_k-th key (ties included).
     top_k = int(rank_cfg["top_k"])
-    ranked = ranked.head(top_k).copy()
-    ranked["rank"] = range(1, len(ranked) + 1)
-
-    out = ranked[
-        [
-            "symbol",
-            "rank",
-            "included",
-            "adv_usd_20",
-            "atr_pct_20",
-            "ret_60d",
-            "trend_proxy",
-            "earnings_within_14d",
-            "score",
-        ]
-    ].copy()
-
-    # Phase 1: synthetic instrument_id for equities.
-    out["instrument_id"] = out["symbol"].map(lambda s: f"EQUITY::{s}")
-    out["asset_class"] = policy.get("asset_class", "EQUITY")
-
-    out = out[
-        [
-            "instrument_id",
-            "symbol",
-            "asset_class",
-            "rank",
-            "included",
-            "adv_usd_20",
-            "atr_pct_20",
-            "ret_60d",
-            "trend_proxy",
-            "earnings_within_14d",
-            "score",
-        ]
-    ].reset_index(drop=True)
+    inc = np.flatnonzero(asof["included"].to_numpy())
+    key = -asof["score"].to_numpy()[inc]
+    cand = np.arange(len(inc))
+    if 0 < top_k < len(inc):
+        kth = np.partition(key, top_k - 1)[top_k - 1]
+        if not np.isnan(kth):
+            cand = np.flatnonzero(key <= kth)
+    order = cand[np.argsort(key[cand], kind="stable")][:top_k]
+
+    # take returns a new frame; rank is attached with assign rather than written
+    # into a defensive copy, as an int64 array (no Python range to box and infer).
+    ranked = asof.take(inc[order]).reset_index(drop=True)
+    ranked = ranked.assign(rank=np.arange(1, len(ranked) + 1, dtype=np.int64))
+
+    # Phase 1: synthetic instrument_id for equities (one vectorized concat, kept in
+    # symbol's string dtype even when empty), then a single projection into the
+    # output column order.
+    out = ranked.assign(
+        instrument_id=("EQUITY::" + ranked["symbol"]).astype(ranked["symbol"].dtype),
+        asset_class=policy.get("asset_class", "EQUITY"),
+    )
+    out = out[list(UNIVERSE_COLUMNS)].reset_index(drop=True)
 
     return UniverseResult(df=out, stubbed_earnings=stubbed)
\ No newline at end of file
@@ -29,6 +29,11 @@ RESEARCH-CORP-ACTIONS-01
     (regression for the prior bug where _earnings_flags_optional always returned a
      DataFrame so stubbed_earnings was always False in the manifest)
 
+INSTRUMENT-IDS
+  - parse_instrument_id / parse_many give the original parser's results and errors:
+    name fields upper-cased, option expiry and strike kept as written, and the same
+    ValueError for wrong part counts, unknown tags and malformed strikes
+
 All tests are pure in-process. No DB, no network, no file I/O (except RESEARCH-PHASE2-01
 which uses a temp dir for the policy file and verifies no run dir is created).
 """
@@ -38,12 +43,19 @@ import tempfile
 import unittest
 from datetime import timezone
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pandas as pd
 
 from mqk_research.data.adapters.options_stub import OptionsChainQuery, load_options_chain_pg
 from mqk_research.data.adapters.futures_stub import FuturesHistoryQuery, load_futures_history_pg
+from mqk_research.instruments.schema import (
+    EquityInstrument,
+    FutureInstrument,
+    OptionInstrument,
+    parse_instrument_id,
+    parse_many,
+)
 from mqk_research.universe.build import build_universe_swing_v1
 
 
@@ -316,6 +328,19 @@ class TestEarningsFlagsOptional(unittest.TestCase):
         result = self._call(engine, ["AAPL", "MSFT"])
         self.assertIsNone(result, "Table absent must return None, not a stub DataFrame")
 
+    def test_returns_none_without_db_when_caller_reports_table_absent(self):
+        """Caller-provided corporate_events_present=False → None, no extra DB probe."""
+        from mqk_research.cli import _earnings_flags_optional
+        engine = MagicMock()
+        result = _earnings_flags_optional(
+            engine,
+            ["AAPL"],
+            pd.Timestamp("2026-01-15T00:00:00Z"),
+            corporate_events_present=False,
+        )
+        self.assertIsNone(result)
+        engine.connect.assert_not_called()
+
     def test_returns_none_when_required_columns_missing(self):
         """Table present but missing required columns → None."""
         # Two separate connect() calls: first for to_regclass, second for columns.
@@ -357,16 +382,15 @@ class TestEarningsFlagsOptional(unittest.TestCase):
                     ("event_ts_utc", "timestamp with time zone"),
                 ]
             else:
-                # Second connect block: pd.read_sql raises
-                cxn.execute.side_effect = Exception("DB connection lost")
+                # Second connect block: the earnings exists() query raises
+                cxn.execute.side_effect = Exception("query failed")
             return cxn
 
         engine = MagicMock()
         engine.connect.return_value.__enter__ = MagicMock(side_effect=make_cxn)
         engine.connect.return_value.__exit__ = MagicMock(return_value=False)
 
-        with patch("mqk_research.cli.pd.read_sql", side_effect=Exception("query failed")):
-            result = self._call(engine, ["AAPL"])
+        result = self._call(engine, ["AAPL"])
         self.assertIsNone(result, "Query failure must return None, not silent False")
 
     def test_returns_real_dataframe_when_query_succeeds_no_events(self):
@@ -387,15 +411,16 @@ class TestEarningsFlagsOptional(unittest.TestCase):
                     ("event_type", "character varying"),
                     ("event_ts_utc", "timestamp with time zone"),
                 ]
+            else:
+                # Second connect block: one exists() row per symbol, none flagged
+                cxn.execute.return_value.all.return_value = [("AAPL", False), ("MSFT", False)]
             return cxn
 
         engine = MagicMock()
         engine.connect.return_value.__enter__ = MagicMock(side_effect=make_cxn)
         engine.connect.return_value.__exit__ = MagicMock(return_value=False)
 
-        empty_df = pd.DataFrame(columns=["symbol", "ts_utc", "event_type"])
-        with patch("mqk_research.cli.pd.read_sql", return_value=empty_df):
-            result = self._call(engine, syms)
+        result = self._call(engine, syms)
 
         self.assertIsNotNone(result, "Successful empty query must return a real DataFrame (not None)")
         self.assertIsInstance(result, pd.DataFrame)
@@ -419,19 +444,20 @@ class TestEarningsFlagsOptional(unittest.TestCase):
                     ("event_type", "character varying"),
                     ("event_ts_utc", "timestamp with time zone"),
                 ]
+            else:
+                # Second connect block: one exists() row per symbol
+                cxn.execute.return_value.all.return_value = [
+                    ("AAPL", True),
+                    ("MSFT", False),
+                    ("GOOG", True),
+                ]
             return cxn
 
         engine = MagicMock()
         engine.connect.return_value.__enter__ = MagicMock(side_effect=make_cxn)
         engine.connect.return_value.__exit__ = MagicMock(return_value=False)
 
-        events_df = pd.DataFrame({
-            "symbol": ["AAPL", "GOOG"],
-            "ts_utc": [pd.Timestamp("2026-01-20T00:00:00Z"), pd.Timestamp("2026-01-22T00:00:00Z")],
-            "event_type": ["EARNINGS", "EARNINGS"],
-        })
-        with patch("mqk_research.cli.pd.read_sql", return_value=events_df):
-            result = self._call(engine, syms)
+        result = self._call(engine, syms)
 
         self.assertIsNotNone(result)
         flags = dict(zip(result["symbol"].tolist(), result["earnings_within_14d"].tolist()))
@@ -517,5 +543,62 @@ class TestUniverseBuilderStubbedEarnings(unittest.TestCase):
         self.assertIn("MSFT", symbols_in_universe)
 
 
+# ---------------------------------------------------------------------------
+# INSTRUMENT-IDS
+# ---------------------------------------------------------------------------
+
+class TestParseInstrumentId(unittest.TestCase):
+
+    def test_valid_ids_including_lower_case(self):
+        """Tag and name fields are case-insensitive; expiry and strike are kept as written."""
+        self.assertEqual(
+            parse_many([
+                "EQUITY::AAPL",
+                "equity::brk.b",
+                "option::spy::2026mar20::p::1e3::x",
+                "OPTION::SPY::20260320::C::500.5::X",
+                "future::es::esm2026",
+            ]),
+            [
+                EquityInstrument(instrument_id="EQUITY::AAPL", symbol="AAPL"),
+                EquityInstrument(instrument_id="EQUITY::BRK.B", symbol="BRK.B"),
+                OptionInstrument(
+                    instrument_id="option::spy::2026mar20::p::1e3::x",
+                    symbol="SPY",
+                    underlying="SPY",
+                    expiry_yyyymmdd="2026mar20",
+                    right="P",
+                    strike=1000.0,
+                ),
+                OptionInstrument(
+                    instrument_id="OPTION::SPY::20260320::C::500.5::X",
+                    symbol="SPY",
+                    underlying="SPY",
+                    expiry_yyyymmdd="20260320",
+                    right="C",
+                    strike=500.5,
+                ),
+                FutureInstrument(instrument_id="future::es::esm2026", symbol="ES", root="ES", contract="ESM2026"),
+            ],
+        )
+
+    def test_malformed_ids_raise_the_original_errors(self):
+        cases = {
+            "": "Invalid instrument_id: ",
+            "EQUITY": "Invalid instrument_id: EQUITY",
+            "equity::a::b": "Invalid equity instrument_id: equity::a::b",
+            "OPTION::SPY::20260320::C::1e3": "Invalid option instrument_id: OPTION::SPY::20260320::C::1e3",
+            "FUTURE::ES": "Invalid future instrument_id: FUTURE::ES",
+            "bond::x": "Unknown instrument tag in instrument_id: bond::x",
+            "option::spy::20260320::c::abc::x": "could not convert string to float: 'abc'",
+        }
+        for instrument_id, message in cases.items():
+            with self.assertRaises(ValueError) as ctx:
+                parse_instrument_id(instrument_id)
+            self.assertEqual(str(ctx.exception), message, instrument_id)
+        with self.assertRaisesRegex(ValueError, "Unknown instrument tag"):
+            parse_many(["EQUITY::AAPL", "BOND::X"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,823 @@
+"""
+Phase 1 artifact I/O tests.
+
+Proves that:
+1. HashingWriter produces the same sha256 as hashing the fully materialized bytes.
+2. HashingWriter forwards every byte to its target when one is given.
+3. _hash_df_csv_bytes (streaming) matches the legacy to_csv().encode() digest, so
+   manifests written before and after the streaming change stay comparable.
+4. run_phase1_equity writes byte-identical artifacts for identical inputs, the
+   manifest file records match the bytes on disk, and a rerun reuses the run dir
+   before any DB work or feature compute.
+5. _load_dotenv_if_present reads KEY=VALUE lines, skips comments and malformed
+   lines, unwraps only one matching pair of outer quotes, and never overwrites
+   variables already in the environment.
+6. _enforce_data_sufficiency passes sufficient bars without mutating them and
+   fails closed on missing symbols, too few bars and stale last bars.
+7. compute_daily_features gives every symbol exactly the values it would get
+   if computed on its own.
+8. build_universe_swing_v1 takes each symbol's last bar regardless of row order
+   or symbol case.
+
+These tests use no DB and no network: the Postgres boundary (engine, preflight,
+history, table_exists) is patched; everything downstream runs for real.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
+
+import numpy as np
+import pandas as pd
+
+from mqk_research.io.hashing import HashingWriter
+
+
+def _bars_fixture(n: int = 500) -> pd.DataFrame:
+    ts = pd.date_range("2025-01-01", periods=n, freq="D", tz="UTC")
+    rng = np.random.default_rng(7)
+    close = 100.0 + rng.standard_normal(n).cumsum()
+    return pd.DataFrame(
+        {
+            "symbol": ["AAPL"] * n,
+            "ts_utc": ts,
+            "open": close,
+            "high": close + 1.0,
+            "low": close - 1.0,
+            "close": close,
+            "volume": rng.integers(1_000, 10_000, n).astype(float),
+        }
+    )
+
+
+class TestHashingWriter(unittest.TestCase):
+    def test_digest_matches_materialized_bytes(self):
+        payload = b"symbol,ts_utc\nAAPL,2025-01-01\n" * 1000
+        w = HashingWriter()
+        w.write(payload[:10])
+        w.write(payload[10:])
+        self.assertEqual(w.hexdigest(), hashlib.sha256(payload).hexdigest())
+        self.assertEqual(w.nbytes, len(payload))
+
+    def test_forwards_to_target(self):
+        target = io.BytesIO()
+        w = HashingWriter(target)
+        w.write(b"abc")
+        w.write(bytearray(b"def"))
+        self.assertEqual(target.getvalue(), b"abcdef")
+        self.assertEqual(w.hexdigest(), hashlib.sha256(b"abcdef").hexdigest())
+
+
+class TestHashDfCsvBytes(unittest.TestCase):
+    def test_streaming_hash_matches_legacy_encode(self):
+        from mqk_research.cli import _hash_df_csv_bytes
+
+        df = _bars_fixture()
+        legacy = hashlib.sha256(df.to_csv(index=False, lineterminator="\n").encode("utf-8")).hexdigest()
+        self.assertEqual(_hash_df_csv_bytes(df), legacy)
+
+    def test_quoting_fast_path_matches_default_dialect(self):
+        from mqk_research.cli import _csv_needs_quoting, _hash_df_csv_bytes
+
+        plain = _bars_fixture(50)
+        tricky = plain.assign(symbol=['BRK,B', 'A"B', "X\nY"] + ["AAPL"] * 47)
+        lone_empty = pd.DataFrame({"symbol": ["AAPL", "", None]})
+        self.assertFalse(_csv_needs_quoting(plain))
+        for df in (plain, tricky, lone_empty):
+            legacy = hashlib.sha256(df.to_csv(index=False, lineterminator="\n").encode("utf-8")).hexdigest()
+            self.assertEqual(_hash_df_csv_bytes(df), legacy)
+
+    def test_datetime_preformat_matches_default_formatter(self):
+        from mqk_research.cli import _hash_df_csv_bytes
+
+        T = pd.Timestamp
+        frames = [
+            _bars_fixture(50),
+            pd.DataFrame({"ts": [T("2025-01-01"), T("2025-01-02"), pd.NaT], "v": 1}),
+            pd.DataFrame({"ts": [T("2025-01-01"), T("2025-01-02 13:30")], "v": 1}),
+            pd.DataFrame({"ts": [T("2025-01-01 00:00:00.5", tz="UTC"), pd.NaT, T("2025-01-01", tz="UTC")], "v": 1}),
+            pd.DataFrame({"ts": pd.Series([pd.NaT, pd.NaT], dtype="datetime64[ns, UTC]"), "v": 1}),
+        ]
+        for df in frames:
+            legacy = hashlib.sha256(df.to_csv(index=False, lineterminator="\n").encode("utf-8")).hexdigest()
+            self.assertEqual(_hash_df_csv_bytes(df), legacy)
+
+
+class TestFinalizeForCsv(unittest.TestCase):
+    def test_presorted_skip_matches_full_sort(self):
+        from mqk_research.cli import finalize_for_csv
+
+        rng = np.random.default_rng(11)
+        n = 400
+        df = pd.DataFrame(
+            {
+                "volume": rng.random(n),
+                "ts_utc": pd.Timestamp("2025-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 30, n), unit="D"),
+                "symbol": rng.choice(["AAPL", "MSFT", "NVDA"], n),
+                "instrument_id": rng.choice(["EQUITY::A", "EQUITY::B"], n),
+            }
+        )
+        df.loc[::7, "ts_utc"] = pd.NaT
+        keys = ["symbol", "ts_utc", "instrument_id"]
+        presorted = df.sort_values(keys, kind="mergesort", ignore_index=True).set_index(np.arange(n) * 3)
+        cats = presorted.assign(symbol=pd.Categorical(presorted["symbol"], ordered=True))
+        with_null = presorted.assign(symbol=presorted["symbol"].where(np.arange(n) < n - 5))
+        for frame in (df, presorted, cats, with_null):
+            legacy = frame.reindex(columns=["symbol", "ts_utc", "volume", "instrument_id"])
+            legacy = legacy.sort_values(keys, kind="mergesort", ignore_index=True)
+            pd.testing.assert_frame_equal(finalize_for_csv(frame, "bars"), legacy)
+
+
+class TestConnectScope(unittest.TestCase):
+    def test_connection_is_reused_and_left_open(self):
+        from sqlalchemy import create_engine
+
+        from mqk_research.io.pg import connect_scope
+
+        engine = create_engine("sqlite://")
+        with engine.connect() as owned:
+            with connect_scope(owned) as cxn:
+                self.assertIs(cxn, owned)
+            self.assertFalse(owned.closed)
+
+    def test_engine_checks_out_and_returns_a_connection(self):
+        from sqlalchemy import create_engine
+
+        from mqk_research.io.pg import connect_scope
+
+        engine = create_engine("sqlite://")
+        with connect_scope(engine) as cxn:
+            self.assertFalse(cxn.closed)
+        self.assertTrue(cxn.closed)
+
+
+class TestReadBarsPartitioned(unittest.TestCase):
+    def test_partitioned_read_matches_single_query(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        rows = pd.DataFrame(
+            {
+                "symbol": ["AAPL", "AAPL", "GOOG", "MSFT", "MSFT", "NVDA"],
+                "ts_raw": [1, 2, 1, 1, 2, 1],
+            }
+        )
+
+        def fake_read_sql(sql, cxn, params, chunksize):
+            # Mimic Postgres: only rows for the bound symbols, in (symbol, ts) order.
+            return iter([rows[rows["symbol"].isin(params["symbols"])].reset_index(drop=True)])
+
+        from sqlalchemy.engine import Connection
+
+        engine = MagicMock()
+        engine.engine = engine  # as Engine.engine is the engine itself
+        snapshot_cxn = MagicMock(spec=Connection)
+        snapshot_cxn.execute.return_value.scalar_one.return_value = "00000003-0000001B-1"
+        engine.connect.return_value.__enter__.return_value.execution_options.return_value = snapshot_cxn
+        syms = ["AAPL", "GOOG", "MSFT", "NVDA", "TSLA"]  # TSLA has no rows
+        with patch.object(bars_postgres.pd, "read_sql", side_effect=fake_read_sql) as read_sql:
+            single = bars_postgres._read_bars_partitioned(engine, "q", {"symbols": syms}, syms, 1)
+            split = bars_postgres._read_bars_partitioned(engine, "q", {"symbols": syms}, syms, 3)
+
+        pd.testing.assert_frame_equal(single, split)
+        self.assertEqual(engine.connect.call_count, 1 + 3)
+        # One exporting transaction; the other two groups adopt its snapshot, and
+        # every group reads on a snapshot connection.
+        snapshot_cxn.execute.assert_called_once()
+        self.assertEqual(
+            snapshot_cxn.exec_driver_sql.call_args_list,
+            [call("set transaction snapshot '00000003-0000001B-1'")] * 2,
+        )
+        self.assertTrue(all(c.args[1] is snapshot_cxn for c in read_sql.call_args_list[1:]))
+
+    def test_streamed_chunks_match_one_fetch(self):
+        from sqlalchemy import create_engine, text
+
+        from mqk_research.data.adapters import bars_postgres
+
+        engine = create_engine("sqlite://")
+        with engine.begin() as cxn:
+            cxn.execute(text("create table md_bars (symbol text, ts_raw integer, close real)"))
+            cxn.execute(
+                text("insert into md_bars values (:s, :t, :c)"),
+                [{"s": s, "t": i, "c": 1.0 + i} for s in ("AAPL", "MSFT") for i in range(5)],
+            )
+        sql = "select symbol, ts_raw, close from md_bars order by symbol, ts_raw"
+        whole = bars_postgres._read_frame(engine, sql, {}, via_copy=False)
+        with patch.object(bars_postgres, "_READ_CHUNK_ROWS", 3):
+            chunked = bars_postgres._read_frame(engine, sql, {}, via_copy=False)
+
+        self.assertEqual(len(whole), 10)
+        pd.testing.assert_frame_equal(whole, chunked)
+
+    def test_chunk_concat_matches_pd_concat(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        chunks = [
+            pd.DataFrame({"symbol": ["AAPL", "AAPL"], "ts_raw": [1, 2], "close_raw": [None, None]}),
+            pd.DataFrame({"symbol": ["MSFT", "MSFT"], "ts_raw": [1, 2], "close_raw": [1.5, np.nan]}),
+            pd.DataFrame({"symbol": ["NVDA"], "ts_raw": [1], "close_raw": [2.0]}),
+        ]
+        for n in (1, 2, 3):
+            expected = pd.concat(chunks[:n], ignore_index=True)
+            pd.testing.assert_frame_equal(bars_postgres._concat_chunks(iter(chunks[:n])), expected)
+        self.assertTrue(bars_postgres._concat_chunks(iter([])).empty)
+
+    def test_single_query_runs_on_a_caller_connection(self):
+        from sqlalchemy.engine import Connection
+
+        from mqk_research.data.adapters import bars_postgres
+
+        cxn = MagicMock(spec=Connection)
+        cxn.engine = MagicMock()
+        with patch.object(bars_postgres.pd, "read_sql", return_value=iter([pd.DataFrame()])) as read_sql:
+            bars_postgres._read_bars_partitioned(cxn, "q", {"symbols": ["AAPL"]}, ["AAPL"], 1)
+
+        self.assertIs(read_sql.call_args[0][1], cxn)
+        cxn.engine.connect.assert_not_called()
+
+
+class TestReadFrameCopy(unittest.TestCase):
+    def test_parses_postgres_csv_like_read_sql(self):
+        from sqlalchemy import create_engine
+
+        from mqk_research.data.adapters import bars_postgres
+
+        engine = MagicMock()
+        engine.dialect = create_engine("postgresql+psycopg://u@localhost/db").dialect
+        cur = engine.connect.return_value.__enter__.return_value.connection.driver_connection.cursor.return_value
+        cur = cur.__enter__.return_value
+        # Postgres COPY CSV: shortest-exact doubles, numeric text, ISO timestamptz.
+        cur.copy.return_value.__enter__.return_value = [
+            b"symbol,ts_utc,open_raw,close_raw,volume\n",
+            b"AAPL,2025-01-02 00:00:00+00,0.30000000000000004,123.450000,1000\n",
+            b'"BRK,B",2025-01-03 13:30:00.5+00,1e-07,2,\n',
+        ]
+        params = {"symbols": ["AAPL", "BRK,B"]}
+        df = bars_postgres._read_frame_copy(engine, "select * from md_bars where symbol = any(:symbols)", params)
+
+        stmt, bound = cur.copy.call_args.args
+        self.assertTrue(stmt.startswith("copy (select * from md_bars where symbol = any(%(symbols)s))"))
+        self.assertIs(bound, params)
+        self.assertEqual(df["symbol"].tolist(), ["AAPL", "BRK,B"])
+        self.assertEqual(
+            df["ts_utc"].tolist(),
+            [pd.Timestamp("2025-01-02", tz="UTC"), pd.Timestamp("2025-01-03 13:30:00.5", tz="UTC")],
+        )
+        self.assertEqual(df["open_raw"].tolist(), [0.30000000000000004, 1e-07])
+        self.assertEqual(df["close_raw"].tolist(), [123.45, 2.0])
+        self.assertEqual(df["volume"].iloc[0], 1000)
+        self.assertTrue(pd.isna(df["volume"].iloc[1]))
+
+    def test_requires_psycopg_driver(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        engine = MagicMock()
+        engine.dialect.driver = "psycopg2"
+        with self.assertRaisesRegex(RuntimeError, "psycopg"):
+            bars_postgres._read_frame_copy(engine, "select 1", {})
+
+
+class TestHistory(unittest.TestCase):
+    def _history(self, raw):
+        from mqk_research.data.adapters import bars_postgres
+
+        schema = ("end_ts", "open", "high", "low", "close", "volume", False)
+        q = bars_postgres.BarsQuery(
+            symbols=["msft", "AAPL"],
+            start_utc=pd.Timestamp("2024-01-01", tz="UTC"),
+            end_utc=pd.Timestamp("2024-02-01", tz="UTC"),
+            timeframe="1D",
+        )
+        with patch.object(bars_postgres, "_load_md_bars_columns", return_value=["symbol", "timeframe"]), \
+                patch.object(bars_postgres, "_detect_md_bars_schema", return_value=schema), \
+                patch.object(bars_postgres, "_column_db_type", return_value="timestamp with time zone"), \
+                patch.object(bars_postgres, "_read_bars_partitioned", return_value=raw):
+            return bars_postgres.history(MagicMock(), q)
+
+    def test_symbol_is_sorted_categorical(self):
+        raw = pd.DataFrame({
+            "symbol": ["msft", "AAPL", "MSFT"],
+            "ts_utc": pd.to_datetime(["2024-01-03", "2024-01-02", "2024-01-02"], utc=True),
+            "open_raw": [1.0, 2.0, 3.0], "high_raw": [1.0, 2.0, 3.0],
+            "low_raw": [1.0, 2.0, 3.0], "close_raw": [1.0, 2.0, 3.0], "volume": [10, 20, 30],
+        })
+        df = self._history(raw)
+
+        self.assertIsInstance(df["symbol"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df["symbol"].cat.categories), ["AAPL", "MSFT"])
+        # "msft" and "MSFT" merge into one upper-cased category.
+        self.assertEqual(df["symbol"].tolist(), ["AAPL", "MSFT", "MSFT"])
+        self.assertEqual(df["close"].tolist(), [2.0, 3.0, 1.0])
+        self.assertEqual(df["close"].dtype, np.float64)
+
+
+class TestCachedEpochUnit(unittest.TestCase):
+    def test_inferred_once_per_engine_and_column(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        e1, e2 = MagicMock(), MagicMock()
+        with patch.object(bars_postgres, "infer_epoch_unit_strict", return_value="ms") as infer:
+            units = [
+                bars_postgres.cached_epoch_unit(e1, "end_ts"),
+                bars_postgres.cached_epoch_unit(e1, "end_ts"),
+                bars_postgres.cached_epoch_unit(e2, "end_ts"),
+            ]
+        self.assertEqual(units, ["ms", "ms", "ms"])
+        self.assertEqual(infer.call_count, 2)
+
+    def test_mixed_unit_failure_is_not_cached(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        engine = MagicMock()
+        with patch.object(bars_postgres, "infer_epoch_unit_strict", side_effect=RuntimeError("MIXED")) as infer:
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    bars_postgres.cached_epoch_unit(engine, "end_ts")
+        self.assertEqual(infer.call_count, 2)
+
+
+class TestDiagnoseEmpty(unittest.TestCase):
+    def test_single_round_trip(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        engine = MagicMock()
+        cxn = engine.connect.return_value.__enter__.return_value
+        cxn.execute.return_value.one.return_value = (
+            ["1D", "1m"], [10, 500], "2024-01-02", "2024-01-15", 10, [False, True], [1, 9],
+        )
+        with patch.object(bars_postgres, "_column_db_type", return_value="timestamp with time zone"):
+            msg = bars_postgres._diagnose_empty(engine, ["AAPL"], "1D", "end_ts", True)
+
+        self.assertEqual(engine.connect.call_count, 1)
+        self.assertIn("available_timeframes_for_symbols=1D=10, 1m=500", msg)
+        self.assertIn("min=2024-01-02 max=2024-01-15 n=10", msg)
+        self.assertIn("is_complete_counts_for_timeframe=False=1, True=9", msg)
+
+    def test_without_is_complete_column(self):
+        from mqk_research.data.adapters import bars_postgres
+
+        engine = MagicMock()
+        cxn = engine.connect.return_value.__enter__.return_value
+        cxn.execute.return_value.one.return_value = (None, None, None, None, 0, None, None)
+        with patch.object(bars_postgres, "_column_db_type", return_value="timestamp with time zone"):
+            msg = bars_postgres._diagnose_empty(engine, ["ZZZZ"], "1D", "end_ts", False)
+
+        self.assertNotIn("is_complete", str(cxn.execute.call_args[0][0]))
+        self.assertIn("available_timeframes_for_symbols=<none>", msg)
+        self.assertIn("is_complete_counts_for_timeframe=n/a", msg)
+
+
+class TestPreflight(unittest.TestCase):
+    def _preflight(self, row):
+        from mqk_research.cli import preflight
+
+        engine = MagicMock()
+        cxn = engine.connect.return_value.__enter__.return_value
+        cxn.execute.return_value.one.return_value = row
+        with patch("mqk_research.cli.md_bars_column_types", return_value={"symbol": "text", "end_ts": "bigint"}):
+            out = preflight(engine)
+        return out, cxn
+
+    def test_single_round_trip_report(self):
+        row = (
+            "mqk", "agent", True,
+            3, 1_700_000_000_000, 1_700_086_400_000, 3, 0, 3,
+            ["1D", "1H"], [2, 1],
+            2, ["AAPL", "MSFT"],
+            ["CREATE INDEX md_bars_symbol_tf_ts ON public.md_bars USING btree (symbol, timeframe, end_ts)"],
+        )
+        out, cxn = self._preflight(row)
+        self.assertEqual(cxn.execute.call_count, 1)
+        self.assertEqual(out["database"], "mqk")
+        self.assertTrue(out["corporate_events_present"])
+        bars = out["md_bars"]
+        self.assertEqual(bars["rows"], 3)
+        self.assertEqual(bars["distinct_symbols"], 2)
+        self.assertEqual(bars["top_symbols"], ["AAPL", "MSFT"])
+        self.assertEqual(bars["timeframes"], [{"timeframe": "1D", "rows": 2}, {"timeframe": "1H", "rows": 1}])
+        self.assertEqual(len(bars["indexes"]), 1)
+        self.assertEqual(bars["end_ts"]["unit"], "ms")
+        self.assertEqual(bars["end_ts"]["counts"], {"n_ms": 3, "n_s": 0, "n_total": 3})
+        self.assertEqual(bars["end_ts"]["as_utc"]["min"], "2023-11-14 22:13:20+00:00")
+
+    def test_mixed_units_fail_closed(self):
+        row = ("mqk", "agent", False, 2, 1_700_000_000, 1_700_000_000_000, 1, 1, 2, ["1D"], [2], 1, ["AAPL"], None)
+        with self.assertRaisesRegex(RuntimeError, "MIXED"):
+            self._preflight(row)
+
+
+_POLICY_YAML = """\
+name: swing_v1
+asset_class: EQUITY
+bars:
+  timeframe: "1D"
+  lookback_days: 140
+filters:
+  min_price: 5.0
+  min_adv_usd_20: 1000.0
+rank:
+  top_k: 200
+portfolio:
+  max_positions: 20
+  top_n: 2
+"""
+
+_SYMBOLS = ["AAPL", "MSFT", "NVDA"]
+_ASOF = pd.Timestamp("2026-01-15T00:00:00Z")
+
+
+def _history_fixture(engine, q, **_kwargs) -> pd.DataFrame:
+    days = pd.bdate_range(q.start_utc.date(), (q.end_utc - pd.Timedelta(days=1)).date(), tz="UTC")
+    parts = []
+    for i, sym in enumerate(q.symbols):
+        n = len(days)
+        close = 50.0 + 10.0 * i + np.linspace(0.0, 5.0 * (i + 1), n) + 0.25 * (np.arange(n) % 7)
+        parts.append(
+            pd.DataFrame(
+                {
+                    "symbol": sym,
+                    "ts_utc": days,
+                    "open": close - 0.5,
+                    "high": close + 1.0,
+                    "low": close - 1.0,
+                    "close": close,
+                    "volume": 1_000_000.0 + 1_000.0 * np.arange(n),
+                }
+            )
+        )
+    return pd.concat(parts, ignore_index=True)
+
+
+class TestRunPhase1Equity(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.policy = self.tmp / "swing_v1.yaml"
+        self.policy.write_text(_POLICY_YAML, encoding="utf-8")
+
+    def _run(self, out_root: Path) -> Path:
+        from mqk_research.cli import run_phase1_equity
+
+        with patch("mqk_research.cli.make_engine", return_value=MagicMock()), \
+                patch("mqk_research.cli._require_md_bars_nonempty"), \
+                patch("mqk_research.cli.table_exists", return_value=False), \
+                patch("mqk_research.cli.history", side_effect=_history_fixture):
+            return run_phase1_equity(
+                policy_path=self.policy,
+                asof_utc=_ASOF,
+                pg_url="postgresql+psycopg://unused",
+                out_root=out_root,
+                symbols_csv=" msft,AAPL,,nvda ,aapl",
+            )
+
+    def test_artifacts_deterministic_and_manifest_matches_disk(self):
+        run_a = self._run(self.tmp / "a")
+        run_b = self._run(self.tmp / "b")
+        self.assertEqual(run_a.name, run_b.name)
+
+        for name in ("features.csv", "universe.csv", "targets.csv"):
+            self.assertEqual((run_a / name).read_bytes(), (run_b / name).read_bytes(), name)
+        # Manifests differ only in the output paths (different out roots).
+        self.assertEqual(
+            (run_a / "manifest.json").read_text(encoding="utf-8").replace(str(run_a), "<RUN>"),
+            (run_b / "manifest.json").read_text(encoding="utf-8").replace(str(run_b), "<RUN>"),
+        )
+
+        man = json.loads((run_a / "manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(man["params"]["symbols"], _SYMBOLS)
+        self.assertEqual(man["policy_sha256"], hashlib.sha256(self.policy.read_bytes()).hexdigest())
+        self.assertTrue(man["inputs"]["optional"]["stubbed_earnings"])
+        for key, rec in man["outputs"].items():
+            data = Path(rec["path"]).read_bytes()
+            self.assertEqual(rec["sha256"], hashlib.sha256(data).hexdigest(), key)
+            self.assertEqual(rec["bytes"], len(data), key)
+
+    def test_artifact_bytes_pinned(self):
+        """
+        Pinned digests for the fixture above. Performance work on the Phase 1 path
+        must not change artifact bytes; a change here is a contract change.
+        """
+        run_dir = self._run(self.tmp / "out")
+        man = json.loads((run_dir / "manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(
+            man["inputs"]["md_bars"]["bars_sha256_csv"],
+            "67f97203d08d5c42cd575e4e437ca937ae67401a6ac4dd4daaef056584ddeb5a",
+        )
+        self.assertEqual(
+            {k: v["sha256"] for k, v in man["outputs"].items()},
+            {
+                "features_csv": "24acf4a426b07710aa71b282a74055f6a84e8eafee3ff92f5e9e0389c01ab9af",
+                "universe_csv": "7012a451a0cb74221fe2e59434767feea042725f6bb95aae4b468fb98775fb4a",
+                "targets_csv": "3574c4ad667385d7879a78fccaedc44a56a665b175fee08aca564cdad7f78c90",
+            },
+        )
+
+    def test_rerun_reuses_existing_run_dir(self):
+        run_dir = self._run(self.tmp / "out")
+        before = (run_dir / "manifest.json").read_bytes()
+        again = self._run(self.tmp / "out")
+        self.assertEqual(again, run_dir)
+        self.assertEqual((run_dir / "manifest.json").read_bytes(), before)
+
+    def test_rerun_is_decided_before_any_db_work(self):
+        from mqk_research.cli import run_phase1_equity
+
+        run_dir = self._run(self.tmp / "out")
+        with patch("mqk_research.cli.make_engine") as make_engine, \
+                patch("mqk_research.cli.history") as history, \
+                patch("mqk_research.cli.compute_daily_features") as compute:
+            again = run_phase1_equity(
+                policy_path=self.policy,
+                asof_utc=_ASOF,
+                pg_url="postgresql+psycopg://unused",
+                out_root=self.tmp / "out",
+                symbols_csv="AAPL,MSFT,NVDA",
+            )
+        self.assertEqual(again, run_dir)
+        make_engine.assert_not_called()
+        history.assert_not_called()
+        compute.assert_not_called()
+
+    def test_rerun_refuses_tampered_outputs(self):
+        run_dir = self._run(self.tmp / "out")
+        with (run_dir / "targets.csv").open("ab") as f:
+            f.write(b"EQUITY::TSLA,TSLA,EQUITY,LONG,0.5\n")
+        with self.assertRaisesRegex(RuntimeError, r"outputs were modified \(targets\.csv size"):
+            self._run(self.tmp / "out")
+
+    def test_rerun_refuses_same_size_tampering(self):
+        run_dir = self._run(self.tmp / "out")
+        path = run_dir / "features.csv"
+        data = bytearray(path.read_bytes())
+        data[-2] = ord("0") if data[-2] != ord("0") else ord("1")
+        path.write_bytes(bytes(data))
+        with self.assertRaisesRegex(RuntimeError, r"outputs were modified \(features\.csv sha256"):
+            self._run(self.tmp / "out")
+
+
+class TestEnforceDataSufficiency(unittest.TestCase):
+    def setUp(self):
+        from mqk_research.data.adapters.bars_postgres import BarsQuery
+
+        self.end = _ASOF.floor("D") + pd.Timedelta(days=1)
+        q = BarsQuery(symbols=_SYMBOLS, start_utc=self.end - pd.Timedelta(days=140), end_utc=self.end, timeframe="1D")
+        self.bars = _history_fixture(None, q)
+
+    def _gate(self, bars, symbols=_SYMBOLS):
+        from mqk_research.cli import _enforce_data_sufficiency
+
+        _enforce_data_sufficiency(bars, symbols, self.end, 140, min_bars_floor=60, max_staleness_days=7)
+
+    def test_sufficient_bars_pass_without_mutating_input(self):
+        before = self.bars.copy()
+        self._gate(self.bars, ["aapl", " MSFT", "NVDA", ""])
+        pd.testing.assert_frame_equal(self.bars, before)
+
+    def test_symbol_stats_match_groupby_on_unordered_input(self):
+        from mqk_research.cli import _symbol_bar_stats
+
+        bars = self.bars.sample(frac=1.0, random_state=3).reset_index(drop=True)
+        bars.loc[::11, "ts_utc"] = pd.NaT
+        expected = bars.groupby("symbol", sort=True)["ts_utc"].agg(n_bars="count", first_ts="min", last_ts="max")
+        for df in (bars, bars.sort_values("symbol", kind="mergesort")):
+            pd.testing.assert_frame_equal(_symbol_bar_stats(df), expected, check_dtype=False)
+
+    def test_categorical_symbols_match_string_symbols(self):
+        from mqk_research.cli import _symbol_bar_stats
+
+        bars = self.bars.sample(frac=1.0, random_state=5).reset_index(drop=True)
+        expected = _symbol_bar_stats(bars)
+        # Lexical categories (the run's layout), then a non-lexical order with a null.
+        cats = pd.Categorical(bars["symbol"], categories=sorted(_SYMBOLS), ordered=True)
+        for df in (bars.assign(symbol=cats), bars.assign(symbol=cats).sort_values("symbol", kind="mergesort")):
+            pd.testing.assert_frame_equal(_symbol_bar_stats(df), expected, check_index_type=False)
+        odd = pd.Categorical(bars["symbol"], categories=sorted(_SYMBOLS, reverse=True))
+        odd[0] = np.nan
+        expected_odd = _symbol_bar_stats(bars.iloc[1:])
+        pd.testing.assert_frame_equal(_symbol_bar_stats(bars.assign(symbol=odd)), expected_odd, check_index_type=False)
+        self._gate(bars.assign(symbol=cats.rename_categories(str.lower)))
+
+    def test_all_null_symbols_fail_closed(self):
+        from mqk_research.cli import _symbol_bar_stats
+
+        bars = self.bars.head(2).assign(symbol=None)
+        for df in (bars, bars.assign(symbol=pd.Categorical([None, None], categories=_SYMBOLS))):
+            stats = _symbol_bar_stats(df)
+            self.assertEqual(len(stats), 0)
+            self.assertEqual(list(stats.columns), ["n_bars", "first_ts", "last_ts"])
+            self.assertEqual(stats.index.name, "symbol")
+        with self.assertRaisesRegex(RuntimeError, r"missing symbols.*\['AAPL'\]"):
+            self._gate(bars, ["AAPL"])
+
+    def test_missing_symbol_fails(self):
+        with self.assertRaisesRegex(RuntimeError, r"missing symbols.*\['TSLA'\]"):
+            self._gate(self.bars, _SYMBOLS + ["TSLA"])
+
+    def test_too_few_bars_fails(self):
+        short = self.bars[(self.bars["symbol"] != "MSFT") | (self.bars["ts_utc"] > self.end - pd.Timedelta(days=30))]
+        with self.assertRaisesRegex(RuntimeError, r"insufficient bars(.|\n)*'MSFT'"):
+            self._gate(short)
+
+    def test_stale_last_bar_fails(self):
+        stale = self.bars[(self.bars["symbol"] != "NVDA") | (self.bars["ts_utc"] < self.end - pd.Timedelta(days=20))]
+        with self.assertRaisesRegex(RuntimeError, r"stale last bar(.|\n)*'NVDA'"):
+            self._gate(stale)
+
+
+class TestReadPolicy(unittest.TestCase):
+    def test_c_loader_matches_safe_loader(self):
+        import yaml
+
+        from mqk_research import cli
+
+        path = Path(cli.__file__).parent / "policies" / "swing_v1.yaml"
+        raw = path.read_bytes()
+        obj, sha = cli._read_policy(path)
+        self.assertEqual(sha, hashlib.sha256(raw).hexdigest())
+        with patch.object(cli, "_YAML_SAFE_LOADER", yaml.SafeLoader):
+            self.assertEqual(cli._read_policy(path)[0], obj)
+        self.assertEqual(obj["policy_name"], "swing_v1")
+
+
+class TestComputeDailyFeatures(unittest.TestCase):
+    def test_grouped_features_match_per_symbol_runs(self):
+        from mqk_research.features.compute import FeatureConfig, compute_daily_features
+
+        rng = np.random.default_rng(5)
+        parts = []
+        for i, sym in enumerate(["AAPL", "MSFT", "NVDA", "TSLA"]):
+            n = 120 - 9 * i
+            close = 50.0 + rng.standard_normal(n).cumsum()
+            close[rng.random(n) < 0.02] = np.nan
+            close[30:35] = close[30]
+            ts = pd.date_range("2025-01-01", periods=n, freq="D", tz="UTC")
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "symbol": sym,
+                        "ts_utc": ts,
+                        "open": close,
+                        "high": close + 1.0,
+                        "low": close - 1.0,
+                        "close": close,
+                        "volume": rng.integers(100, 1000, n).astype(float),
+                    }
+                )
+            )
+        bars = pd.concat(parts, ignore_index=True).sample(frac=1.0, random_state=1)
+        cfg = FeatureConfig()
+
+        together = compute_daily_features(bars, cfg)
+        alone = pd.concat([compute_daily_features(p, cfg) for p in parts], ignore_index=True)
+        # A symbol's features never depend on the other symbols in the frame.
+        pd.testing.assert_frame_equal(together, alone, check_exact=True)
+
+
+class TestBuildUniverse(unittest.TestCase):
+    def test_asof_is_last_bar_per_symbol_in_any_row_order(self):
+        from mqk_research.universe.build import build_universe_swing_v1
+
+        features = pd.DataFrame(
+            {
+                "symbol": ["msft", "AAPL", "MSFT", "AAPL", "aapl"],
+                "ts_utc": pd.to_datetime(["2025-01-03", "2025-01-02", "2025-01-02", "2025-01-03", "2025-01-01"], utc=True),
+                "close": [20.0, 11.0, 21.0, 12.0, 10.0],
+                "adv_usd_20": [1e7] * 5,
+                "atr_pct_20": [0.01] * 5,
+                "ret_60d": [0.5, 0.1, 0.4, 0.2, 0.0],
+                "trend_proxy": [0.0] * 5,
+            }
+        )
+        policy = {"filters": {"min_price": 5, "min_adv_usd_20": 1e5}, "rank": {"top_k": 10}}
+
+        out = build_universe_swing_v1(features, policy, None).df
+
+        self.assertEqual(out["symbol"].tolist(), ["MSFT", "AAPL"])
+        self.assertEqual(out["ret_60d"].tolist(), [0.5, 0.2])
+        self.assertEqual(out["instrument_id"].tolist(), ["EQUITY::MSFT", "EQUITY::AAPL"])
+
+    def test_top_k_matches_stable_score_symbol_sort(self):
+        from mqk_research.universe.build import build_universe_swing_v1
+
+        # Sorted scores: 1.0, 0.5 x4, +/-0.0 x4, -1.0, NaN x2; S12 is filtered out.
+        scores = [0.5, np.nan, 0.0, -0.0, 0.5, 1.0, np.nan, -0.0, 0.0, 0.5, -1.0, 0.5, 2.0]
+        n = len(scores)
+        features = pd.DataFrame(
+            {
+                "symbol": [f"S{i:02d}" for i in range(n)][::-1],
+                "ts_utc": pd.Timestamp("2025-01-02", tz="UTC"),
+                "close": [1.0] + [10.0] * (n - 1),
+                "adv_usd_20": 1e7,
+                "atr_pct_20": 0.01,
+                "ret_60d": scores[::-1],
+                "trend_proxy": 0.0,
+            }
+        )
+        asof = features.sort_values("symbol", ignore_index=True)
+        asof["score"] = asof["ret_60d"] + asof["trend_proxy"]
+        included = asof[asof["close"] > 5]
+
+        for top_k in (0, 1, 3, 5, 7, 9, len(included) - 1, len(included), 100):
+            policy = {"filters": {"min_price": 5, "min_adv_usd_20": 1e5}, "rank": {"top_k": top_k}}
+            out = build_universe_swing_v1(features, policy, None).df
+            expected = included.sort_values(["score", "symbol"], ascending=[False, True], kind="mergesort").head(top_k)
+            self.assertEqual(out["symbol"].tolist(), expected["symbol"].tolist(), top_k)
+            self.assertEqual(out["rank"].tolist(), list(range(1, len(expected) + 1)), top_k)
+            np.testing.assert_array_equal(np.signbit(out["score"]), np.signbit(expected["score"]))
+
+    def _earnings_universe(self, earnings_flags):
+        from mqk_research.universe.build import build_universe_swing_v1
+
+        symbols = ["AAPL", "AMD", "MSFT", "NVDA", "TSLA"]
+        features = pd.DataFrame(
+            {
+                "symbol": symbols,
+                "ts_utc": pd.Timestamp("2025-01-02", tz="UTC"),
+                "close": 10.0,
+                "adv_usd_20": 1e7,
+                "atr_pct_20": 0.01,
+                "ret_60d": [0.5, 0.4, 0.3, 0.2, 0.1],
+                "trend_proxy": 0.0,
+            }
+        )
+        policy = {"filters": {"min_price": 5, "min_adv_usd_20": 1e5}, "rank": {"top_k": 10}}
+        return build_universe_swing_v1(features, policy, earnings_flags)
+
+    def test_earnings_flags_match_case_insensitively_and_first_flag_wins(self):
+        flags = pd.DataFrame(
+            {
+                # aapl/AAPL: first (False) wins; NVDA/nvda: first (True) wins;
+                # msft is a case variant; ZZZ matches no universe symbol.
+                "symbol": ["aapl", "AAPL", "NVDA", "nvda", "msft", "ZZZ"],
+                "earnings_within_14d": [False, True, True, False, True, True],
+            }
+        )
+        res = self._earnings_universe(flags)
+        self.assertFalse(res.stubbed_earnings)
+        self.assertEqual(res.df["symbol"].tolist(), ["AAPL", "AMD", "TSLA"])
+        self.assertEqual(res.df["earnings_within_14d"].tolist(), [False, False, False])
+
+    def test_missing_earnings_flags_read_as_false(self):
+        flags_by_dtype = (
+            [None, True, np.nan],
+            pd.array([pd.NA, True, pd.NA], dtype="boolean"),
+            [np.nan, 1.0, np.nan],
+        )
+        for flags in flags_by_dtype:
+            res = self._earnings_universe(pd.DataFrame({"symbol": ["AAPL", "MSFT", "tsla"], "earnings_within_14d": flags}))
+            self.assertEqual(res.df["symbol"].tolist(), ["AAPL", "AMD", "NVDA", "TSLA"])
+            self.assertEqual(res.df["earnings_within_14d"].dtype, bool)
+            self.assertFalse(res.df["earnings_within_14d"].any())
+        empty = self._earnings_universe(pd.DataFrame({"symbol": [], "earnings_within_14d": []}))
+        self.assertEqual(empty.df["symbol"].tolist(), ["AAPL", "AMD", "MSFT", "NVDA", "TSLA"])
+        self.assertFalse(empty.stubbed_earnings)
+
+
+class TestLoadDotenv(unittest.TestCase):
+    def test_parses_lines_and_keeps_existing_env(self):
+        from mqk_research.cli import _load_dotenv_if_present
+
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / ".env"
+            path.write_text(
+                "# comment\n"
+                "  MQK_T_A = alpha \n"
+                "\n"
+                "MQK_T_B='bravo'\n"
+                "   # MQK_T_C=commented\n"
+                "not a pair\n"
+                "=no_key\n"
+                "MQK_T_D=x=y\n"
+                'MQK_T_E="it\'s"\n'
+                "MQK_T_F='hello'\"world\"\n"
+                "MQK_T_G=\"\n"
+                "MQK_T_KEEP=from_file\n",
+                encoding="utf-8",
+            )
+            with patch.dict(os.environ, {"MQK_T_KEEP": "from_env"}):
+                _load_dotenv_if_present(path)
+                got = {k: v for k, v in os.environ.items() if k.startswith("MQK_T_")}
+
+        self.assertEqual(
+            got,
+            {
+                "MQK_T_A": "alpha",
+                "MQK_T_B": "bravo",
+                "MQK_T_D": "x=y",
+                "MQK_T_E": "it's",
+                "MQK_T_F": "'hello'\"world\"",
+                "MQK_T_G": '"',
+                "MQK_T_KEEP": "from_env",
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()